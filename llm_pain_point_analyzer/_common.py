@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+LLM痛点分析器 - 各分析模块共用的内部工具
+JSON读写、字符串驻留、只读配置和惰性属性
+"""
+
+import json
+import sys
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Mapping, Optional
+
+try:
+    import orjson  # 可选依赖：C实现的JSON解析/序列化
+except ImportError:
+    orjson = None  # type: ignore[assignment]
+
+
+def _json_loads(data):
+    """解析JSON（优先使用orjson）"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _json_dumps(obj, default: Optional[Callable[[Any], Any]] = None) -> str:
+    """
+    序列化为缩进的JSON文本，非ASCII字符原样输出（优先使用orjson）
+
+    default: JSON无法表示的值的转换函数（如 str），默认遇到这类值时报错
+    """
+    if orjson is not None:
+        return orjson.dumps(
+            obj, default=default, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+        ).decode("utf-8")
+    return json.dumps(obj, indent=2, ensure_ascii=False, default=default)
+
+
+def _json_dumps_compact(obj) -> bytes:
+    """序列化为紧凑的UTF-8 JSON字节串（优先使用orjson）"""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _intern_strings(obj):
+    """递归驻留JSON数据中的字符串（sys.intern），相同内容的字符串共享同一个对象，比较时走身份判断的快速路径"""
+    if isinstance(obj, str):
+        return sys.intern(obj)
+    if isinstance(obj, dict):
+        return {sys.intern(key): _intern_strings(value) for key, value in obj.items()}
+    if isinstance(obj, list):
+        return [_intern_strings(item) for item in obj]
+    return obj
+
+
+def _freeze_config(data: Dict) -> Mapping:
+    """把配置数据及其每个条目包装为只读映射，可安全地在实例间共享"""
+    return MappingProxyType(
+        {
+            key: MappingProxyType(value) if isinstance(value, dict) else value
+            for key, value in data.items()
+        }
+    )
+
+
+class _LazyAttributes:
+    """
+    按需计算的实例属性
+
+    子类在 __slots__ 中声明属性槽，并在 _LAZY_ATTRIBUTES 中登记 属性名 -> 计算方法名；
+    属性首次访问时调用计算方法并把结果存入槽，之后直接读取槽，不再经过 __getattr__
+    """
+
+    __slots__ = ()
+
+    _LAZY_ATTRIBUTES: Dict[str, str] = {}
+
+    def __getattr__(self, name: str) -> Any:
+        """首次访问尚未赋值的惰性属性时计算并存入对应的槽，之后直接读取槽"""
+        try:
+            builder = self._LAZY_ATTRIBUTES[name]
+        except KeyError:
+            raise AttributeError(
+                f"'{type(self).__name__}' object has no attribute '{name}'"
+            ) from None
+        value = getattr(self, builder)()
+        setattr(self, name, value)
+        return value
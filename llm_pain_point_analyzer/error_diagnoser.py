@@ -4,37 +4,247 @@ LLM痛点分析器 - 错误诊断模块
 解决API操作模式混淆问题
 """
 
-import json
 import sys
 import re
 import argparse
 import os
+import functools
+import io
 from pathlib import Path
-from typing import Dict, List, Optional, Any, Tuple
-from datetime import datetime
-import subprocess
-from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Tuple, TextIO
 
-class ErrorDiagnoser:
+from llm_pain_point_analyzer._common import _LazyAttributes, _intern_strings, _json_dumps, _json_loads
+
+# 正则元字符（不含 ".*" 通配），用于判断模式片段是否为纯字面量
+_REGEX_METACHARS = re.compile(r"[.^$*+?{}\[\]\\|()]")
+# 内联全局标志（如 "(?i)"），含此标志的模式不能嵌入合并的交替正则
+_INLINE_GLOBAL_FLAGS = re.compile(r"\(\?[aiLmsux]+\)")
+
+
+def _literal_fragments(pattern: str) -> Tuple[str, ...]:
+    """
+    提取由 ".*" 连接的字面片段
+    
+    模式能匹配的前提是所有片段都出现在错误信息中；
+    含其他正则语法的模式无法这样分析，返回空元组（不做预筛选）
+    """
+    parts = pattern.split(".*")
+    if any(_REGEX_METACHARS.search(part) for part in parts):
+        return ()
+    return tuple(part.lower() for part in parts if part)
+
+
+def _copy_diagnosis(diagnosis):
+    """递归复制缓存的诊断结果中的列表和字典（字符串等不可变值共享），防止调用方修改缓存"""
+    if isinstance(diagnosis, dict):
+        return {key: _copy_diagnosis(value) for key, value in diagnosis.items()}
+    if isinstance(diagnosis, list):
+        return [_copy_diagnosis(item) for item in diagnosis]
+    return diagnosis
+
+
+class ErrorDiagnoser(_LazyAttributes):
     """智能错误诊断器"""
     
-    def __init__(self, config_dir: str = None):
+    # 诊断器常驻于工作进程中，用槽代替实例 __dict__ 以减小内存占用
+    __slots__ = (
+        "config_dir",
+        "_diagnose_cached",
+        "error_patterns",
+        "api_specs",
+        "solution_templates",
+        "common_mistakes",
+        "_category_table",
+        "_pattern_table",
+        "_fragment_index",
+        "_category_regexes",
+        "_api_spec_index",
+        "_common_mistake_index",
+        "_mistakes_by_tool",
+    )
+    
+    # 惰性属性 -> 计算方法。配置文件在首次访问时才加载，只用到部分配置的调用不产生多余的I/O；
+    # 预处理表同样在首次诊断时才构建
+    _LAZY_ATTRIBUTES = {
+        "error_patterns": "load_error_patterns",
+        "api_specs": "load_api_specs",
+        "solution_templates": "load_solution_templates",
+        "common_mistakes": "load_common_mistakes",
+        "_category_table": "_build_category_table",
+        "_pattern_table": "_build_pattern_table",
+        "_fragment_index": "_build_fragment_index",
+        "_category_regexes": "_build_category_regexes",
+        "_api_spec_index": "_build_api_spec_index",
+        "_common_mistake_index": "_build_common_mistake_index",
+        "_mistakes_by_tool": "_build_mistakes_by_tool",
+    }
+    
+    def __init__(self, config_dir: Optional[str] = None):
         """初始化错误诊断器"""
         if config_dir is None:
             config_dir = os.path.join(os.path.dirname(__file__), "../config")
         
         self.config_dir = Path(config_dir)
-        self.error_patterns = self.load_error_patterns()
-        self.api_specs = self.load_api_specs()
-        self.solution_templates = self.load_solution_templates()
-        self.common_mistakes = self.load_common_mistakes()
+        # 相同输入的诊断结果缓存（重试循环中同一错误会反复出现）
+        self._diagnose_cached = functools.lru_cache(maxsize=1024)(self._diagnose)
+    
+    def _build_category_table(self) -> Tuple[List[str], List[str], List[str], List[List[str]], List[range]]:
+        """
+        按列存放的错误类别信息
+        
+        Returns:
+            (类别名, 类别, 严重程度, 常见工具, 该类别在模式表中的下标范围)，下标即类别索引
+        """
+        names, categories, severities, common_tools, pattern_ranges = [], [], [], [], []
+        start = 0
+        for category_name, category_info in self.error_patterns.items():
+            names.append(category_name)
+            categories.append(category_info.get("category", category_name))
+            severities.append(category_info.get("severity", "unknown"))
+            common_tools.append(category_info.get("common_tools", []))
+            end = start + len(category_info.get("patterns", []))
+            pattern_ranges.append(range(start, end))
+            start = end
+        return names, categories, severities, common_tools, pattern_ranges
+    
+    def _build_pattern_table(self) -> Tuple[List[re.Pattern], List[str], List[Optional[str]], List[Optional[re.Pattern]], List[Tuple[str, ...]], List[Tuple[str, ...]], List[bool], List[int]]:
+        """
+        按列存放的预编译错误模式，避免每次诊断重复解析正则
+        
+        Returns:
+            (正则, 原始模式, 去掉通配的紧凑字面量, 紧凑字面量为None时使用的紧凑正则,
+             字面片段, 模式中的单词, 是否纯字面模式, 所属类别索引)，按类别顺序展平
+        """
+        regexes: List[re.Pattern] = []
+        sources: List[str] = []
+        compact_literals: List[Optional[str]] = []
+        compact_regexes: List[Optional[re.Pattern]] = []
+        fragment_lists: List[Tuple[str, ...]] = []
+        word_lists: List[Tuple[str, ...]] = []
+        literals: List[bool] = []
+        groups: List[int] = []
+        for index, category_info in enumerate(self.error_patterns.values()):
+            for pattern in category_info.get("patterns", []):
+                regex = re.compile(pattern, re.IGNORECASE)
+                fragments = _literal_fragments(pattern)
+                regexes.append(regex)
+                sources.append(pattern)
+                # 去掉通配后的紧凑形式，用于置信度判断；由字面片段组成时直接做子串检查
+                compact_regex = re.compile(pattern.replace(".*", ""), re.IGNORECASE)
+                compact_literal: Optional[str] = "".join(fragments)
+                if not fragments or compact_regex.fullmatch(compact_literal) is None:
+                    compact_literal = None
+                compact_literals.append(compact_literal)
+                compact_regexes.append(compact_regex if compact_literal is None else None)
+                fragment_lists.append(fragments)
+                # 部分匹配判断用的单词
+                word_lists.append(tuple(dict.fromkeys(re.findall(r'\b\w+\b', pattern))))
+                # 纯字面模式（如 "429"、"forbidden"）：片段出现即匹配，不需要正则
+                literals.append(fragments == (pattern.lower(),) and regex.fullmatch(fragments[0]) is not None)
+                groups.append(index)
+        return regexes, sources, compact_literals, compact_regexes, fragment_lists, word_lists, literals, groups
+    
+    def _build_fragment_index(self) -> Tuple[Dict[str, set], set, Tuple[str, ...]]:
+        """
+        字面片段索引
+        
+        Returns:
+            (片段 -> 包含该片段的类别索引,
+             含无法预筛选模式、始终需要检查的类别索引,
+             每次诊断需要检查是否出现的全部字面量：片段和模式单词)
+        """
+        fragment_categories: Dict[str, set] = {}
+        unfiltered_categories = set()
+        _, _, _, _, fragment_lists, word_lists, _, groups = self._pattern_table
+        for fragments, group in zip(fragment_lists, groups):
+            if not fragments:
+                unfiltered_categories.add(group)
+            for fragment in fragments:
+                fragment_categories.setdefault(fragment, set()).add(group)
+        vocabulary = tuple(dict.fromkeys(
+            [*fragment_categories, *(word for words in word_lists for word in words)]
+        ))
+        return fragment_categories, unfiltered_categories, vocabulary
+    
+    def _build_category_regexes(self) -> List[Optional[re.Pattern]]:
+        """
+        每个类别的全部模式合并成的一个交替正则，一次扫描判断类别内是否有模式匹配
+        
+        含分组（反向引用在合并后会指向其他模式的分组）或内联全局标志（如 "(?i)"，
+        只能出现在整个表达式开头）的模式无法安全合并，此时该类别为None，逐个模式检查
+        """
+        regexes, _, _, _, _, _, _, groups = self._pattern_table
+        combinable = [True] * len(self.error_patterns)
+        for regex, group in zip(regexes, groups):
+            if regex.groups or _INLINE_GLOBAL_FLAGS.search(regex.pattern):
+                combinable[group] = False
+        return [
+            re.compile("|".join(f"(?:{pattern})" for pattern in category_info.get("patterns", [])) or "(?!)",
+                       re.IGNORECASE) if combinable[index] else None
+            for index, category_info in enumerate(self.error_patterns.values())
+        ]
+    
+    def _build_api_spec_index(self) -> Dict[str, Dict[str, Tuple[List[Tuple[str, str, str]], List[Tuple[str, Dict]]]]]:
+        """
+        预先转为小写的API规格错误信息
+        
+        Returns:
+            {工具: {操作: ([(错误码, 描述, 小写描述)], [(小写症状, 常见错误)])}}
+        """
+        index = {}
+        for tool_name, actions in self.api_specs.items():
+            index[tool_name] = {
+                action: (
+                    [(code, description, description.lower())
+                     for code, description in api_spec.get("error_messages", {}).items()],
+                    [(mistake.get("symptom", "").lower(), mistake)
+                     for mistake in api_spec.get("common_mistakes", [])]
+                )
+                for action, api_spec in actions.items()
+            }
+        return index
+    
+    def _build_common_mistake_index(self) -> List[Tuple[str, str, str, Dict]]:
+        """常见错误列表：(错误ID, 工具前缀, 小写错误消息, 错误信息)"""
+        return [
+            (mistake_id, mistake_id.split("_")[0], mistake_info.get("error_message", "").lower(), mistake_info)
+            for mistake_id, mistake_info in self.common_mistakes.items()
+        ]
+    
+    def _build_mistakes_by_tool(self) -> Tuple[Dict[str, List[Tuple[str, str, str, Dict]]], List[Tuple[str, str, str, Dict]]]:
+        """
+        按工具前缀划分的常见错误，保持原有顺序
         
+        Returns:
+            (工具前缀 -> 该工具及通用(permission/parameter)的常见错误, 只含通用常见错误的列表)
+        """
+        generic_prefixes = ("permission", "parameter")
+        entries = self._common_mistake_index
+        generic_mistakes = [entry for entry in entries if entry[1] in generic_prefixes]
+        mistakes_by_tool = {}
+        for _, tool_part, _, _ in entries:
+            if tool_part not in mistakes_by_tool and tool_part not in generic_prefixes:
+                mistakes_by_tool[tool_part] = [
+                    entry for entry in entries if entry[1] == tool_part or entry[1] in generic_prefixes
+                ]
+        return mistakes_by_tool, generic_mistakes
+    
+    def _load_config(self, filename: str) -> Optional[Dict]:
+        """读取配置目录中的JSON文件，文件不存在时返回None"""
+        try:
+            with open(self.config_dir / filename, 'rb', buffering=0) as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        # 解决方案等文本在各配置和诊断结果中大量重复，驻留后只保留一份
+        # （内置默认配置中的字符串是代码常量，本来就是共享的）
+        return _intern_strings(_json_loads(data))
+    
     def load_error_patterns(self) -> Dict:
         """加载错误模式"""
-        patterns_file = self.config_dir / "error_patterns.json"
-        if patterns_file.exists():
-            with open(patterns_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
+        patterns = self._load_config("error_patterns.json")
+        if patterns is not None:
+            return patterns
         
         # 默认错误模式
         return {
@@ -115,10 +325,9 @@ class ErrorDiagnoser:
     
     def load_api_specs(self) -> Dict:
         """加载API规格"""
-        specs_file = self.config_dir / "api_specs.json"
-        if specs_file.exists():
-            with open(specs_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
+        specs = self._load_config("api_specs.json")
+        if specs is not None:
+            return specs
         
         # 默认API规格
         return {
@@ -218,10 +427,9 @@ class ErrorDiagnoser:
     
     def load_solution_templates(self) -> Dict:
         """加载解决方案模板"""
-        templates_file = self.config_dir / "solution_templates.json"
-        if templates_file.exists():
-            with open(templates_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
+        templates = self._load_config("solution_templates.json")
+        if templates is not None:
+            return templates
         
         # 默认解决方案模板
         return {
@@ -331,10 +539,9 @@ class ErrorDiagnoser:
     
     def load_common_mistakes(self) -> Dict:
         """加载常见错误"""
-        mistakes_file = self.config_dir / "common_mistakes.json"
-        if mistakes_file.exists():
-            with open(mistakes_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
+        mistakes = self._load_config("common_mistakes.json")
+        if mistakes is not None:
+            return mistakes
         
         # 默认常见错误
         return {
@@ -368,7 +575,7 @@ class ErrorDiagnoser:
             }
         }
     
-    def diagnose_error(self, error_message: str, tool_name: str = None, action: str = None, context: Dict = None) -> Dict:
+    def diagnose_error(self, error_message: str, tool_name: Optional[str] = None, action: Optional[str] = None, context: Optional[Dict] = None) -> Dict:
         """
         诊断错误
         
@@ -381,7 +588,43 @@ class ErrorDiagnoser:
         Returns:
             错误诊断结果
         """
-        diagnosis = {
+        try:
+            context_key = None if context is None else tuple(sorted(context.items()))
+            hash(context_key)
+        except TypeError:
+            # 上下文不可哈希时不走缓存
+            return self._diagnose(error_message, tool_name, action, context)
+        
+        return _copy_diagnosis(self._diagnose_cached(error_message, tool_name, action, context_key))
+    
+    def diagnose_errors_batch(self, error_messages: Iterable[str], tool_name: Optional[str] = None, action: Optional[str] = None, context: Optional[Dict] = None) -> List[Dict]:
+        """
+        批量诊断错误（如扫描日志文件中的大量错误）
+        
+        相同的错误信息只诊断一次，且不经过单条诊断的结果缓存，大批量日志不会把常用结果挤出缓存
+        
+        Args:
+            error_messages: 错误信息序列
+            tool_name: 工具名称
+            action: 操作名称
+            context: 上下文信息
+            
+        Returns:
+            与输入顺序一致的诊断结果列表（每项都是独立的副本）
+        """
+        messages = list(error_messages)
+        diagnoses = {
+            message: self._diagnose(message, tool_name, action, context)
+            for message in dict.fromkeys(messages)
+        }
+        return [_copy_diagnosis(diagnoses[message]) for message in messages]
+    
+    def _diagnose(self, error_message: str, tool_name: Optional[str] = None, action: Optional[str] = None, context=None) -> Dict:
+        """诊断错误（context 可以是字典或其可哈希的键值对元组）"""
+        if isinstance(context, tuple):
+            context = dict(context)
+        
+        diagnosis: Dict[str, Any] = {
             "error_message": error_message,
             "tool": tool_name,
             "action": action,
@@ -432,95 +675,126 @@ class ErrorDiagnoser:
         diagnosis["short_term_solutions"].extend(solutions.get("short_term", []))
         diagnosis["long_term_solutions"].extend(solutions.get("long_term", []))
         
-        # 5. 去重解决方案
-        diagnosis["immediate_solutions"] = list(set(diagnosis["immediate_solutions"]))
-        diagnosis["short_term_solutions"] = list(set(diagnosis["short_term_solutions"]))
-        diagnosis["long_term_solutions"] = list(set(diagnosis["long_term_solutions"]))
-        diagnosis["prevention_measures"] = list(set(diagnosis["prevention_measures"]))
+        # 5. 去重解决方案（保持原有顺序，最相关的方案排在前面）
+        for key in ("immediate_solutions", "short_term_solutions", "long_term_solutions", "prevention_measures"):
+            diagnosis[key] = list(dict.fromkeys(diagnosis[key]))
         
         return diagnosis
     
     def match_error_patterns(self, error_message: str) -> List[Dict]:
-        """匹配错误模式"""
+        """
+        匹配错误模式
+        
+        Args:
+            error_message: 错误信息
+            
+        Returns:
+            按置信度排序的匹配列表
+        """
         matches = []
         error_lower = error_message.lower()
         
-        for category_name, category_info in self.error_patterns.items():
-            patterns = category_info.get("patterns", [])
+        # 先确定出现了哪些字面片段（每个片段只扫描一遍），缺少片段的模式不可能匹配，跳过其正则
+        fragment_categories, unfiltered_categories, vocabulary = self._fragment_index
+        present = {literal for literal in vocabulary if literal in error_lower}
+        # 没有任何关键词出现的类别整体跳过
+        candidate_categories = unfiltered_categories.union(
+            *(fragment_categories[literal] for literal in present if literal in fragment_categories)
+        )
+        
+        names, categories, severities, common_tools, pattern_ranges = self._category_table
+        regexes, sources, compact_literals, compact_regexes, fragment_lists, word_lists, literals, _ = self._pattern_table
+        
+        category_regexes = self._category_regexes
+        
+        for group in sorted(candidate_categories):
+            # 含无法预筛选模式的类别先用合并正则扫描一次，整类不匹配则省去逐个模式的扫描
+            category_regex = category_regexes[group]
+            if group in unfiltered_categories and category_regex is not None and not category_regex.search(error_lower):
+                continue
             
-            for pattern in patterns:
-                if re.search(pattern, error_lower, re.IGNORECASE):
+            for i in pattern_ranges[group]:
+                if not present.issuperset(fragment_lists[i]):
+                    continue
+                
+                if literals[i]:
+                    # 纯字面模式已由片段检查确认出现，紧凑形式就是模式本身
+                    confidence = 0.9
+                elif regexes[i].search(error_lower):
                     confidence = 1.0
                     
                     # 根据匹配强度调整置信度
-                    if re.search(pattern.replace(".*", ""), error_lower, re.IGNORECASE):
+                    compact_literal = compact_literals[i]
+                    if (compact_literal in error_lower if compact_literal is not None
+                            else compact_regexes[i].search(error_lower)):
                         confidence = 0.9
-                    else:
+                    elif not present.isdisjoint(word_lists[i]):
                         # 部分匹配
-                        matched_words = re.findall(r'\b\w+\b', pattern)
-                        if any(word in error_lower for word in matched_words):
-                            confidence = 0.7
-                    
-                    matches.append({
-                        "category": category_info.get("category", category_name),
-                        "type": category_name,
-                        "severity": category_info.get("severity", "unknown"),
-                        "pattern": pattern,
-                        "confidence": confidence,
-                        "common_tools": category_info.get("common_tools", [])
-                    })
-                    break  # 每个类别只匹配第一个模式
+                        confidence = 0.7
+                else:
+                    continue
+                
+                matches.append({
+                    "category": categories[group],
+                    "type": names[group],
+                    "severity": severities[group],
+                    "pattern": sources[i],
+                    "confidence": confidence,
+                    "common_tools": common_tools[group]
+                })
+                break  # 每个类别只匹配第一个模式
         
         # 按置信度排序
         matches.sort(key=lambda x: x["confidence"], reverse=True)
         return matches
     
-    def analyze_tool_specific_error(self, tool_name: str, action: str, error_message: str, context: Dict = None) -> Dict:
+    def analyze_tool_specific_error(self, tool_name: str, action: str, error_message: str, context: Optional[Dict] = None) -> Dict:
         """分析工具特定错误"""
-        result = {
+        result: Dict[str, Any] = {
             "tool_specific_analysis": {},
             "api_spec_violations": [],
             "parameter_issues": []
         }
+        error_lower = error_message.lower()
         
         # 检查API规格
-        if tool_name in self.api_specs and action in self.api_specs[tool_name]:
-            api_spec = self.api_specs[tool_name][action]
+        api_spec = self._api_spec_index.get(tool_name, {}).get(action)
+        if api_spec is not None:
+            error_messages, common_mistakes = api_spec
             
             # 检查错误消息
-            error_messages = api_spec.get("error_messages", {})
-            for code, description in error_messages.items():
-                if code in error_message or description.lower() in error_message.lower():
+            for code, description, description_lower in error_messages:
+                if code in error_message or description_lower in error_lower:
                     result["tool_specific_analysis"]["error_code"] = code
                     result["tool_specific_analysis"]["error_description"] = description
             
             # 检查常见错误
-            common_mistakes = api_spec.get("common_mistakes", [])
-            for mistake in common_mistakes:
-                if mistake.get("symptom", "").lower() in error_message.lower():
+            for symptom_lower, mistake in common_mistakes:
+                if symptom_lower in error_lower:
                     result["tool_specific_analysis"]["common_mistake"] = mistake
         
         # 分析参数问题
-        if "parameter" in error_message.lower() or "invalid" in error_message.lower():
+        if "parameter" in error_lower or "invalid" in error_lower:
             result["parameter_issues"].append("检查参数名称和格式")
             result["parameter_issues"].append("验证必填参数是否提供")
         
         return result
     
-    def match_common_mistakes(self, error_message: str, tool_name: str = None, action: str = None) -> List[Dict]:
+    def match_common_mistakes(self, error_message: str, tool_name: Optional[str] = None, action: Optional[str] = None) -> List[Dict]:
         """匹配常见错误"""
         matches = []
         error_lower = error_message.lower()
         
-        for mistake_id, mistake_info in self.common_mistakes.items():
-            # 检查工具匹配
-            if tool_name:
-                tool_part = mistake_id.split("_")[0]
-                if tool_name != tool_part and tool_part != "permission" and tool_part != "parameter":
-                    continue
-            
+        if tool_name:
+            # 只检查该工具的常见错误和通用（permission/parameter）常见错误
+            mistakes_by_tool, generic_mistakes = self._mistakes_by_tool
+            candidates = mistakes_by_tool.get(tool_name, generic_mistakes)
+        else:
+            candidates = self._common_mistake_index
+        
+        for mistake_id, _, message_lower, mistake_info in candidates:
             # 检查错误消息匹配
-            if mistake_info.get("error_message", "").lower() in error_lower:
+            if message_lower in error_lower:
                 matches.append({
                     "id": mistake_id,
                     "description": mistake_info.get("description", ""),
@@ -531,9 +805,9 @@ class ErrorDiagnoser:
         
         return matches
     
-    def generate_solutions(self, error_category: str, tool_name: str = None, action: str = None, context: Dict = None) -> Dict:
+    def generate_solutions(self, error_category: str, tool_name: Optional[str] = None, action: Optional[str] = None, context: Optional[Dict] = None) -> Dict:
         """生成解决方案"""
-        solutions = {
+        solutions: Dict[str, List[str]] = {
             "immediate": [],
             "short_term": [],
             "long_term": []
@@ -557,7 +831,7 @@ class ErrorDiagnoser:
     
     def get_tool_specific_solutions(self, tool_name: str, action: str, error_category: str) -> Dict:
         """获取工具特定解决方案"""
-        solutions = {
+        solutions: Dict[str, List[str]] = {
             "immediate": [],
             "short_term": [],
             "long_term": []
@@ -583,90 +857,127 @@ class ErrorDiagnoser:
         
         return solutions
     
-    def format_diagnosis_report(self, diagnosis: Dict) -> str:
-        """格式化诊断报告"""
-        report = []
-        report.append("=" * 70)
-        report.append("LLM痛点分析器 - 智能错误诊断报告")
-        report.append("=" * 70)
-        report.append(f"错误信息: {diagnosis.get('error_message', '未知错误')}")
+    def format_diagnosis_report(self, diagnosis: Dict, out: Optional[TextIO] = None) -> Optional[str]:
+        """
+        格式化诊断报告
+        
+        Args:
+            diagnosis: 诊断结果
+            out: 输出流；提供时逐行直接写入（末尾带换行），不在内存中拼接整份报告
+            
+        Returns:
+            未提供out时返回报告文本，否则返回None
+        """
+        buffer: Optional[io.StringIO] = None
+        if out is None:
+            out = buffer = io.StringIO()
+        write = out.write
+        write("=" * 70 + "\n")
+        write("LLM痛点分析器 - 智能错误诊断报告\n")
+        write("=" * 70 + "\n")
+        write(f"错误信息: {diagnosis.get('error_message', '未知错误')}\n")
         
         if diagnosis.get('tool'):
-            report.append(f"工具: {diagnosis['tool']}")
+            write(f"工具: {diagnosis['tool']}\n")
         
         if diagnosis.get('action'):
-            report.append(f"操作: {diagnosis['action']}")
+            write(f"操作: {diagnosis['action']}\n")
         
-        report.append(f"错误类别: {diagnosis.get('error_category', '未知')}")
-        report.append(f"严重程度: {diagnosis.get('severity', '未知')}")
-        report.append(f"诊断置信度: {diagnosis.get('confidence', 0.0)*100:.1f}%")
-        report.append("-" * 70)
+        write(f"错误类别: {diagnosis.get('error_category', '未知')}\n")
+        write(f"严重程度: {diagnosis.get('severity', '未知')}\n")
+        write(f"诊断置信度: {diagnosis.get('confidence', 0.0)*100:.1f}%\n")
+        write("-" * 70 + "\n")
         
         # 根本原因
         if diagnosis.get('root_cause') and diagnosis['root_cause'] != '未知':
-            report.append("根本原因:")
-            report.append(f"  {diagnosis['root_cause']}")
+            write("根本原因:\n")
+            write(f"  {diagnosis['root_cause']}\n")
         
         # 匹配的模式
         if diagnosis.get('matched_patterns'):
-            report.append("\n匹配的错误模式:")
+            write("\n匹配的错误模式:\n")
             for match in diagnosis['matched_patterns'][:3]:
-                report.append(f"  • {match.get('type', '未知')} (置信度: {match.get('confidence', 0.0)*100:.1f}%)")
+                write(f"  • {match.get('type', '未知')} (置信度: {match.get('confidence', 0.0)*100:.1f}%)\n")
         
         # 常见错误
         if diagnosis.get('related_common_mistakes'):
-            report.append("\n相关常见错误:")
+            write("\n相关常见错误:\n")
             for mistake in diagnosis['related_common_mistakes'][:2]:
-                report.append(f"  • {mistake.get('description', '未知')}")
+                write(f"  • {mistake.get('description', '未知')}\n")
         
         # 立即解决方案
         if diagnosis.get('immediate_solutions'):
-            report.append("\n立即解决方案:")
+            write("\n立即解决方案:\n")
             for i, solution in enumerate(diagnosis['immediate_solutions'][:5], 1):
-                report.append(f"  {i}. {solution}")
+                write(f"  {i}. {solution}\n")
         
         # 短期解决方案
         if diagnosis.get('short_term_solutions'):
-            report.append("\n短期解决方案 (1-7天):")
+            write("\n短期解决方案 (1-7天):\n")
             for i, solution in enumerate(diagnosis['short_term_solutions'][:3], 1):
-                report.append(f"  {i}. {solution}")
+                write(f"  {i}. {solution}\n")
         
         # 长期解决方案
         if diagnosis.get('long_term_solutions'):
-            report.append("\n长期解决方案 (1-4周):")
+            write("\n长期解决方案 (1-4周):\n")
             for i, solution in enumerate(diagnosis['long_term_solutions'][:2], 1):
-                report.append(f"  {i}. {solution}")
+                write(f"  {i}. {solution}\n")
         
         # 预防措施
         if diagnosis.get('prevention_measures'):
-            report.append("\n预防措施:")
+            write("\n预防措施:\n")
             for i, measure in enumerate(diagnosis['prevention_measures'][:3], 1):
-                report.append(f"  {i}. {measure}")
+                write(f"  {i}. {measure}\n")
         
-        report.append("=" * 70)
-        return "\n".join(report)
+        write("=" * 70)
+        if buffer is None:
+            write("\n")
+            return None
+        return buffer.getvalue()
+
+
+@functools.lru_cache(maxsize=8)
+def get_error_diagnoser(config_dir: Optional[str] = None) -> ErrorDiagnoser:
+    """获取共享的错误诊断器实例（按配置目录缓存，避免重复加载配置）"""
+    return ErrorDiagnoser(config_dir)
 
 
 def main():
     """命令行入口点"""
     parser = argparse.ArgumentParser(description="LLM痛点分析器 - 错误诊断模块")
-    parser.add_argument("error", help="错误信息")
+    parser.add_argument("error", nargs="?", help="错误信息")
+    parser.add_argument("--errors-file", help="批量诊断：每行一条错误信息的文件")
     parser.add_argument("--tool", help="工具名称")
     parser.add_argument("--action", help="操作名称")
     parser.add_argument("--config-dir", help="配置文件目录")
     parser.add_argument("--format", choices=["json", "text"], default="text", help="输出格式")
     
     args = parser.parse_args()
+    if args.error is None and args.errors_file is None:
+        parser.error("需要提供错误信息或 --errors-file")
     
     diagnoser = ErrorDiagnoser(args.config_dir)
     
+    if args.errors_file:
+        # 批量诊断
+        with open(args.errors_file, encoding="utf-8") as f:
+            errors = [line.strip() for line in f if line.strip()]
+        diagnoses = diagnoser.diagnose_errors_batch(errors, args.tool, args.action)
+        
+        if args.format == "json":
+            print(_json_dumps(diagnoses))
+        else:
+            for diagnosis in diagnoses:
+                diagnoser.format_diagnosis_report(diagnosis, out=sys.stdout)
+        return
+    
     # 诊断错误
     diagnosis = diagnoser.diagnose_error(args.error, args.tool, args.action)
     
     if args.format == "json":
-        print(json.dumps(diagnosis, indent=2, ensure_ascii=False))
+        print(_json_dumps(diagnosis))
     else:
-        print(diagnoser.format_diagnosis_report(diagnosis))
+        diagnoser.format_diagnosis_report(diagnosis, out=sys.stdout)
 
 
 if __name__ == "__main__":
@@ -1,18 +1,74 @@
+import asyncio
+import re
+from typing import Any, Callable, Dict, List, Optional
+
 from mcp.server.fastmcp import FastMCP
-from llm_pain_point_analyzer.permission_analyzer import PermissionAnalyzer
-from llm_pain_point_analyzer.tool_recommender import ToolRecommender
-from llm_pain_point_analyzer.error_diagnoser import ErrorDiagnoser
+from llm_pain_point_analyzer._common import _json_dumps
+from llm_pain_point_analyzer.permission_analyzer import get_permission_analyzer
+from llm_pain_point_analyzer.tool_recommender import get_tool_recommender
+from llm_pain_point_analyzer.error_diagnoser import get_error_diagnoser
 
 # Initialize MCP Server
 mcp = FastMCP("llm-pain-point-analyzer")
 
-# Initialize Analyzers
-permission_analyzer = PermissionAnalyzer()
-tool_recommender = ToolRecommender()
-error_diagnoser = ErrorDiagnoser()
+# Shared analyzer instances (reused by any other in-process caller).
+# The analyzers are synchronous and CPU-bound; the tools run them with asyncio.to_thread
+# so one slow analysis does not block the event loop for other clients.
+permission_analyzer = get_permission_analyzer()
+tool_recommender = get_tool_recommender()
+error_diagnoser = get_error_diagnoser()
+
+def _to_json(result) -> str:
+    """Serialize a tool result as JSON text; values JSON cannot represent are converted with str()."""
+    return _json_dumps(result, default=str)
+
+def _analyze_permissions(api_name: str, required_permissions: list[str], available_permissions: list[str]):
+    """Analyze an API call ("tool.action") against the permissions the caller reports and return the raw result."""
+    tool_name, _, action = api_name.partition(".")
+    result = permission_analyzer.analyze_permission_requirements(tool_name, action)
+    
+    # Caller-supplied permissions take precedence over the database and the simulated current permissions
+    required = list(required_permissions) or result["permissions_required"]
+    available = set(available_permissions)
+    status = permission_analyzer.check_permission_status(required, available)
+    missing = [permission for permission in required if permission not in available]
+    
+    result["permissions_required"] = required
+    result["permissions_available"] = list(available_permissions)
+    result["missing_permissions"] = missing
+    result["permission_status"] = status
+    if result["error_message"] is None:
+        result["suggestions"] = permission_analyzer.generate_suggestions(tool_name, action, status, missing)
+    return result
+
+def _recommend_tools(task_description: str, complexity: str = "medium", requirements: Optional[List[str]] = None):
+    """Analyze the task, apply the caller's complexity and requirements, and return the raw recommendations."""
+    task_analysis = tool_recommender.analyze_task(task_description)
+    if complexity:
+        task_analysis["complexity"] = complexity
+    if requirements:
+        # Requirements are matched against tool descriptions like the extracted keywords
+        task_analysis["keywords"] = list(dict.fromkeys(task_analysis["keywords"] + [requirement.lower() for requirement in requirements]))
+    return {
+        "task_analysis": task_analysis,
+        "recommendations": tool_recommender.recommend_tools(task_analysis)
+    }
+
+# "feishu_doc.create(...)" -> ("feishu_doc", "create")
+_API_CALL_RE = re.compile(r"^\s*([A-Za-z_]\w*)\.([A-Za-z_]\w*)")
+
+def _diagnose_error(api_call: str, error_message: str, observed_behavior: Optional[str] = None):
+    """Diagnose the error of an API call and return the raw result."""
+    match = _API_CALL_RE.match(api_call or "")
+    tool_name: Optional[str] = match.group(1) if match else None
+    action: Optional[str] = match.group(2) if match else None
+    # The observed behavior often carries the symptom (e.g. content written into the title), so it is matched too
+    message = f"{error_message}\n{observed_behavior}" if observed_behavior else error_message
+    context = {"api_call": api_call, "observed_behavior": observed_behavior}
+    return error_diagnoser.diagnose_error(message, tool_name, action, context)
 
 @mcp.tool()
-def analyze_permissions(api_name: str, required_permissions: list[str], available_permissions: list[str]) -> str:
+async def analyze_permissions(api_name: str, required_permissions: list[str], available_permissions: list[str]) -> str:
     """
     Analyze permission issues for an API call.
     
@@ -22,18 +78,13 @@ def analyze_permissions(api_name: str, required_permissions: list[str], availabl
         available_permissions: List of permissions the user/bot currently has
         
     Returns:
-        A formatted string describing missing permissions and suggested actions.
+        A JSON object describing missing permissions and suggested actions.
     """
-    issue = {
-        "api": api_name,
-        "required_permissions": required_permissions,
-        "available_permissions": available_permissions
-    }
-    result = permission_analyzer.analyze(issue)
-    return str(result)
+    result = await asyncio.to_thread(_analyze_permissions, api_name, required_permissions, available_permissions)
+    return _to_json(result)
 
 @mcp.tool()
-def recommend_tools(task_description: str, complexity: str = "medium", requirements: list[str] = None) -> str:
+async def recommend_tools(task_description: str, complexity: str = "medium", requirements: Optional[List[str]] = None) -> str:
     """
     Recommend the best tools for a given task.
     
@@ -43,18 +94,13 @@ def recommend_tools(task_description: str, complexity: str = "medium", requireme
         requirements: Optional list of specific requirements (e.g., ["python", "async"])
         
     Returns:
-        A formatted string with tool recommendations and success probabilities.
+        A JSON object with tool recommendations and success probabilities.
     """
-    task = {
-        "description": task_description,
-        "complexity": complexity,
-        "requirements": requirements or []
-    }
-    result = tool_recommender.recommend(task)
-    return str(result)
+    result = await asyncio.to_thread(_recommend_tools, task_description, complexity, requirements)
+    return _to_json(result)
 
 @mcp.tool()
-def diagnose_error(api_call: str, error_message: str, observed_behavior: str = None) -> str:
+async def diagnose_error(api_call: str, error_message: str, observed_behavior: Optional[str] = None) -> str:
     """
     Diagnose an API error or unexpected behavior.
     
@@ -64,15 +110,55 @@ def diagnose_error(api_call: str, error_message: str, observed_behavior: str = N
         observed_behavior: Optional description of what actually happened
         
     Returns:
-        A formatted string with the root cause and correct usage.
+        A JSON object with the root cause and correct usage.
     """
-    error = {
-        "api_call": api_call,
-        "error_message": error_message,
-        "observed_behavior": observed_behavior
-    }
-    result = error_diagnoser.diagnose(error)
-    return str(result)
+    result = await asyncio.to_thread(_diagnose_error, api_call, error_message, observed_behavior)
+    return _to_json(result)
+
+# Operations that batch_analyze can dispatch to (returning raw results, serialized once for the whole batch)
+_BATCH_OPERATIONS: Dict[str, Callable[..., Any]] = {
+    "analyze_permissions": _analyze_permissions,
+    "recommend_tools": _recommend_tools,
+    "diagnose_error": _diagnose_error,
+}
+
+@mcp.tool()
+async def batch_analyze(requests: list[dict], stop_on_error: bool = False, max_concurrent: int = 4) -> str:
+    """
+    Run several analyses in a single call instead of one round-trip per tool.
+    
+    Args:
+        requests: Sub-requests of the form {"id": "...", "operation": "analyze_permissions" |
+            "recommend_tools" | "diagnose_error", "params": {...}}; params are the arguments
+            of the corresponding tool. Requests without an id are keyed by their position.
+        stop_on_error: Skip sub-requests that have not started yet once one fails
+        max_concurrent: Maximum number of sub-requests running at the same time
+        
+    Returns:
+        A JSON object keyed by request id, each value either {"result": ...} or {"error": ...}.
+    """
+    semaphore = asyncio.Semaphore(max(1, max_concurrent))
+    failed = asyncio.Event()
+    
+    async def run(index: int, request: dict) -> tuple:
+        request_id = str(request.get("id", index))
+        async with semaphore:
+            if failed.is_set():
+                return request_id, {"error": "Skipped after an earlier failure"}
+            try:
+                name = request.get("operation")
+                operation = _BATCH_OPERATIONS.get(name) if isinstance(name, str) else None
+                if operation is None:
+                    raise ValueError(f"Unknown operation: {name!r}")
+                result: Any = await asyncio.to_thread(operation, **request.get("params", {}))
+            except Exception as e:
+                if stop_on_error:
+                    failed.set()
+                return request_id, {"error": f"{type(e).__name__}: {e}"}
+        return request_id, {"result": result}
+    
+    results = await asyncio.gather(*(run(index, request) for index, request in enumerate(requests)))
+    return _to_json(dict(results))
 
 if __name__ == "__main__":
     mcp.run()
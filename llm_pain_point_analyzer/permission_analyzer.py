@@ -4,17 +4,199 @@ LLM痛点分析器 - 权限验证模块
 解决权限认知偏差问题
 """
 
-import json
 import sys
-import argparse
 import os
+import functools
+import threading
+from collections import Counter
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import AbstractSet, Any, Dict, Iterable, List, Mapping, Optional, Sequence
+
+from llm_pain_point_analyzer._common import _freeze_config, _intern_strings, _json_dumps, _json_loads
+
+
+# 已加载的配置文件：路径 -> 只读配置数据（文件不存在时为None）
+_config_cache: Dict[str, Optional[Mapping]] = {}
+_config_lock = threading.Lock()
+
+
+# 内置默认数据库（配置文件不存在时使用），导入时构建一次，各实例共享只读数据
+_DEFAULT_PERMISSIONS: Mapping = _freeze_config(_intern_strings({
+    "feishu_doc": {
+        "create": ["docx:document:write_only"],
+        "read": ["docx:document:read_only"],
+        "update_block": ["docx:document:write_only"],
+        "delete_block": ["docx:document:write_only"]
+    },
+    "feishu_drive": {
+        "list": ["drive:drive:read_only"],
+        "create_folder": ["drive:drive:write_only"],
+        "delete": ["drive:drive:write_only"]
+    },
+    "feishu_wiki": {
+        "get": ["wiki:wiki:read_only"],
+        "create": ["wiki:wiki:write_only"]
+    }
+}))
+
+_DEFAULT_TOOLS: Mapping = _freeze_config({
+    "feishu_doc": {
+        "description": "飞书文档操作工具",
+        "actions": ["create", "read", "write", "append", "list_blocks", "get_block", "update_block", "delete_block"],
+        "category": "document",
+        "complexity": "medium"
+    },
+    "feishu_drive": {
+        "description": "飞书云存储管理工具",
+        "actions": ["list", "info", "create_folder", "move", "delete"],
+        "category": "storage",
+        "complexity": "low"
+    },
+    "feishu_wiki": {
+        "description": "飞书知识库操作工具",
+        "actions": ["spaces", "nodes", "get", "search", "create", "move", "rename"],
+        "category": "wiki",
+        "complexity": "medium"
+    },
+    "web_search": {
+        "description": "网页搜索工具",
+        "actions": ["search"],
+        "category": "search",
+        "complexity": "low",
+        "requires_api_key": True
+    },
+    "web_fetch": {
+        "description": "网页内容提取工具",
+        "actions": ["fetch"],
+        "category": "content",
+        "complexity": "low"
+    }
+})
+
+
+def _load_json_config(path: str) -> Optional[Mapping]:
+    """
+    读取JSON配置文件，按路径缓存，所有实例共享同一份只读数据
+    
+    首次加载在锁内进行，并发创建的分析器也只会解析一次
+    
+    Returns:
+        配置数据（只读映射），文件不存在时返回None
+    """
+    try:
+        return _config_cache[path]
+    except KeyError:
+        pass
+    
+    with _config_lock:
+        if path not in _config_cache:
+            try:
+                # 直接读取，不先检查文件是否存在（省去一次stat）
+                data = Path(path).read_bytes()
+            except FileNotFoundError:
+                _config_cache[path] = None
+            else:
+                _config_cache[path] = _freeze_config(_intern_strings(_json_loads(data)))
+        return _config_cache[path]
+
+
+def _copy_result(result: Dict) -> Dict:
+    """复制缓存的分析结果（复制其中的列表），防止调用方修改缓存"""
+    return {key: list(value) if isinstance(value, list) else value for key, value in result.items()}
+
+
+_SEPARATOR = "=" * 60
+
+# 权限需求未知时使用的占位权限
+_UNKNOWN_PERMISSION = "unknown:unknown:unknown"
+
+# 各权限状态的建议模板（{tool}、{action}、{perms} 在生成建议时填入）
+_SUGGESTION_TEMPLATES = {
+    "unknown": (
+        "权限需求未知，建议查看 {tool} 的文档",
+        "尝试调用 {tool}.{action} 看具体错误信息",
+    ),
+    "insufficient": (
+        "权限不足，需要以下权限: {perms}",
+        "建议联系管理员添加以下权限范围: {perms}",
+    ),
+    "sufficient": (
+        "权限充足，可以执行 {tool}.{action}",
+    ),
+}
+
+# (工具, 操作, 权限状态) -> 附加的特定工具建议
+_EXTRA_SUGGESTIONS = {
+    ("feishu_doc", "create", "insufficient"): (
+        "注意: feishu_doc.create(content='...') 会将内容写入标题，需要两步操作",
+        "第一步: 创建只有标题的文档",
+        "第二步: 使用 update_block 添加正文内容",
+    ),
+}
+
+# 任务类型触发词 -> (对应的工具类别, 加分)：触发词出现在任务描述中时，这些类别的工具加分
+_CATEGORY_TRIGGERS = (
+    (("文档", "doc", "write"), ("document", "wiki"), 3),
+    (("搜索", "search"), ("search",), 3),
+    (("文件", "file", "storage"), ("storage",), 3),
+)
+
+
+@functools.lru_cache(maxsize=256)
+def _report_header(tool_name: str, action: str) -> str:
+    """报告开头的固定部分（标题、工具、操作），同一工具操作只渲染一次"""
+    return "\n".join((
+        _SEPARATOR,
+        "LLM痛点分析器 - 权限验证报告",
+        _SEPARATOR,
+        f"工具: {tool_name}",
+        f"操作: {action}",
+    ))
+
+
+def _analysis_report_header(analysis_result: Dict) -> str:
+    """分析结果对应的报告开头（工具、操作不可哈希时不走缓存）"""
+    tool_name = analysis_result.get('tool', 'unknown')
+    action = analysis_result.get('action', 'unknown')
+    try:
+        return _report_header(tool_name, action)
+    except TypeError:
+        return _report_header.__wrapped__(tool_name, action)
+
+
+def _render_analysis_report(analysis_result: Dict):
+    """逐行生成权限分析报告"""
+    yield _analysis_report_header(analysis_result)
+    yield f"权限状态: {analysis_result.get('permission_status', 'unknown')}"
+    yield ""
+    
+    # 权限信息
+    yield "权限需求:"
+    yield from (f"  - {perm}" for perm in analysis_result.get("permissions_required", ()))
+    
+    yield ""
+    yield "当前可用权限:"
+    yield from (f"  - {perm}" for perm in analysis_result.get("permissions_available", ()))
+    
+    # 错误信息
+    if analysis_result.get("error_message"):
+        yield ""
+        yield "错误信息:"
+        yield f"  {analysis_result['error_message']}"
+    
+    # 建议
+    if analysis_result.get("suggestions"):
+        yield ""
+        yield "建议:"
+        yield from (f"  - {suggestion}" for suggestion in analysis_result["suggestions"])
+    
+    yield _SEPARATOR
+
 
 class PermissionAnalyzer:
     """权限验证和分析器"""
     
-    def __init__(self, config_dir: str = None):
+    def __init__(self, config_dir: Optional[str] = None):
         """初始化权限分析器"""
         if config_dir is None:
             config_dir = os.path.join(os.path.dirname(__file__), "../config")
@@ -22,76 +204,41 @@ class PermissionAnalyzer:
         self.config_dir = Path(config_dir)
         self.permissions_db = self.load_permissions_db()
         self.tools_db = self.load_tools_db()
+        # 工具名称（不可变，避免每次推荐都重新生成列表）
+        self._tool_names = tuple(self.tools_db)
+        # 工具不存在时的提示（保持列表形式的输出）
+        self._available_tools_hint = f"可用的工具: {list(self._tool_names)}"
+        # 当前可用权限集合，权限检查时做哈希查找而不是线性扫描列表
+        self._available_perms = frozenset(map(sys.intern, self.simulate_current_permissions()))
+        # 相同工具和操作的分析结果缓存
+        self._analyze_cached = functools.lru_cache(maxsize=512)(self._analyze_permission_requirements)
+        # 工具推荐用的预处理数据：{工具名: (小写工具名, 类别, 小写描述)}
+        self._tool_match_index = {
+            tool_name: (tool_name.lower(), tool_info.get("category", ""), tool_info.get("description", "").lower())
+            for tool_name, tool_info in self.tools_db.items()
+        }
+        # 关键词 -> 描述中包含该关键词的工具，任务中反复出现的词只扫描一次描述
+        self._keyword_tools = functools.lru_cache(maxsize=4096)(self._find_tools_by_keyword)
         
-    def load_permissions_db(self) -> Dict:
+    def load_permissions_db(self) -> Mapping:
         """加载权限数据库"""
-        permissions_file = self.config_dir / "permissions.json"
-        if permissions_file.exists():
-            with open(permissions_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
+        permissions = _load_json_config(str(self.config_dir / "permissions.json"))
+        if permissions is not None:
+            return permissions
         
         # 默认权限数据库
-        return {
-            "feishu_doc": {
-                "create": ["docx:document:write_only"],
-                "read": ["docx:document:read_only"],
-                "update_block": ["docx:document:write_only"],
-                "delete_block": ["docx:document:write_only"]
-            },
-            "feishu_drive": {
-                "list": ["drive:drive:read_only"],
-                "create_folder": ["drive:drive:write_only"],
-                "delete": ["drive:drive:write_only"]
-            },
-            "feishu_wiki": {
-                "get": ["wiki:wiki:read_only"],
-                "create": ["wiki:wiki:write_only"]
-            }
-        }
+        return _DEFAULT_PERMISSIONS
     
-    def load_tools_db(self) -> Dict:
+    def load_tools_db(self) -> Mapping:
         """加载工具数据库"""
-        tools_file = self.config_dir / "tools.json"
-        if tools_file.exists():
-            with open(tools_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
+        tools = _load_json_config(str(self.config_dir / "tools.json"))
+        if tools is not None:
+            return tools
         
         # 默认工具数据库
-        return {
-            "feishu_doc": {
-                "description": "飞书文档操作工具",
-                "actions": ["create", "read", "write", "append", "list_blocks", "get_block", "update_block", "delete_block"],
-                "category": "document",
-                "complexity": "medium"
-            },
-            "feishu_drive": {
-                "description": "飞书云存储管理工具",
-                "actions": ["list", "info", "create_folder", "move", "delete"],
-                "category": "storage",
-                "complexity": "low"
-            },
-            "feishu_wiki": {
-                "description": "飞书知识库操作工具",
-                "actions": ["spaces", "nodes", "get", "search", "create", "move", "rename"],
-                "category": "wiki",
-                "complexity": "medium"
-            },
-            "web_search": {
-                "description": "网页搜索工具",
-                "actions": ["search"],
-                "category": "search",
-                "complexity": "low",
-                "requires_api_key": True
-            },
-            "web_fetch": {
-                "description": "网页内容提取工具",
-                "actions": ["fetch"],
-                "category": "content",
-                "complexity": "low"
-            }
-        }
+        return _DEFAULT_TOOLS
     
-    def analyze_permission_requirements(self, tool_name: str, action: str, params: Dict = None) -> Dict:
+    def analyze_permission_requirements(self, tool_name: str, action: str, params: Optional[Dict] = None) -> Dict:
         """
         分析权限需求
         
@@ -103,7 +250,12 @@ class PermissionAnalyzer:
         Returns:
             权限需求分析结果
         """
-        result = {
+        # 分析结果只取决于工具和操作（params 暂未参与分析）
+        return _copy_result(self._analyze_cached(tool_name, action))
+    
+    def _analyze_permission_requirements(self, tool_name: str, action: str) -> Dict:
+        """分析权限需求（结果会被缓存，调用方应通过 analyze_permission_requirements 获取副本）"""
+        result: Dict[str, Any] = {
             "tool": tool_name,
             "action": action,
             "permissions_required": [],
@@ -115,33 +267,31 @@ class PermissionAnalyzer:
         }
         
         # 检查工具是否存在
-        if tool_name not in self.tools_db:
+        tool_info = self.tools_db.get(tool_name)
+        if tool_info is None:
             result["error_message"] = f"工具 '{tool_name}' 不存在于工具数据库中"
             result["suggestions"].append(f"检查工具名称是否正确")
-            result["suggestions"].append(f"可用的工具: {list(self.tools_db.keys())}")
+            result["suggestions"].append(self._available_tools_hint)
             return result
         
         # 检查操作是否支持
-        tool_info = self.tools_db[tool_name]
-        if action not in tool_info.get("actions", []):
+        actions = tool_info.get("actions", [])
+        if action not in actions:
             result["error_message"] = f"工具 '{tool_name}' 不支持操作 '{action}'"
-            result["suggestions"].append(f"支持的操作: {tool_info.get('actions', [])}")
+            result["suggestions"].append(f"支持的操作: {actions}")
             return result
         
         # 获取所需权限
-        if tool_name in self.permissions_db and action in self.permissions_db[tool_name]:
-            result["permissions_required"] = self.permissions_db[tool_name][action]
-        else:
-            result["permissions_required"] = ["unknown:unknown:unknown"]
+        permissions_required = self.permissions_db.get(tool_name, {}).get(action)
+        if permissions_required is None:
+            permissions_required = [_UNKNOWN_PERMISSION]
+        result["permissions_required"] = permissions_required
         
         # 模拟获取当前权限（实际应用中应从OpenClaw获取）
         result["permissions_available"] = self.simulate_current_permissions()
         
         # 检查权限状态
-        result["permission_status"] = self.check_permission_status(
-            result["permissions_required"], 
-            result["permissions_available"]
-        )
+        result["permission_status"] = self.check_permission_status(result["permissions_required"])
         
         # 生成建议
         result["suggestions"] = self.generate_suggestions(
@@ -162,41 +312,41 @@ class PermissionAnalyzer:
             "wiki:wiki:read_only"
         ]
     
-    def check_permission_status(self, required: List[str], available: List[str]) -> str:
-        """检查权限状态"""
-        if "unknown:unknown:unknown" in required:
-            return "unknown"
+    def check_permission_status(self, required: List[str], available: Optional[Iterable[str]] = None) -> str:
+        """
+        检查权限状态
         
-        for perm in required:
-            if perm not in available:
-                return "insufficient"
+        Args:
+            required: 所需权限
+            available: 可用权限（集合或列表），默认为当前权限（直接使用预先构建的集合）
+            
+        Returns:
+            "sufficient"、"insufficient" 或 "unknown"
+        """
+        if _UNKNOWN_PERMISSION in required:
+            return "unknown"
         
-        return "sufficient"
+        available_set: AbstractSet[str]
+        if available is None:
+            available_set = self._available_perms
+        elif isinstance(available, (set, frozenset)):
+            available_set = available
+        else:
+            available_set = frozenset(available)
+        # 集合包含判断在C层面完成，缺少任一权限即为不足
+        return "sufficient" if available_set.issuperset(required) else "insufficient"
     
     def generate_suggestions(self, tool_name: str, action: str, status: str, required_perms: List[str]) -> List[str]:
         """生成建议"""
-        suggestions = []
-        
-        if status == "unknown":
-            suggestions.append(f"权限需求未知，建议查看 {tool_name} 的文档")
-            suggestions.append(f"尝试调用 {tool_name}.{action} 看具体错误信息")
-        
-        elif status == "insufficient":
-            suggestions.append(f"权限不足，需要以下权限: {', '.join(required_perms)}")
-            suggestions.append(f"建议联系管理员添加以下权限范围: {', '.join(required_perms)}")
-            
-            # 特定工具的建议
-            if tool_name == "feishu_doc" and action == "create":
-                suggestions.append("注意: feishu_doc.create(content='...') 会将内容写入标题，需要两步操作")
-                suggestions.append("第一步: 创建只有标题的文档")
-                suggestions.append("第二步: 使用 update_block 添加正文内容")
-        
-        elif status == "sufficient":
-            suggestions.append(f"权限充足，可以执行 {tool_name}.{action}")
+        templates = _SUGGESTION_TEMPLATES.get(status, ())
+        perms = ", ".join(required_perms) if status == "insufficient" else ""
+        suggestions = [template.format(tool=tool_name, action=action, perms=perms) for template in templates]
         
+        # 特定工具的建议
+        suggestions.extend(_EXTRA_SUGGESTIONS.get((tool_name, action, status), ()))
         return suggestions
     
-    def get_tool_recommendation(self, task_description: str, available_tools: List[str] = None) -> Dict:
+    def get_tool_recommendation(self, task_description: str, available_tools: Optional[Sequence[str]] = None) -> Dict:
         """
         根据任务描述推荐工具
         
@@ -208,44 +358,42 @@ class PermissionAnalyzer:
             工具推荐结果
         """
         if available_tools is None:
-            available_tools = list(self.tools_db.keys())
+            available_tools = self._tool_names
         
         # 简单的关键词匹配（实际应用中可以使用更复杂的NLP）
         recommendations = []
         
-        # 分析任务类型
+        # 分析任务类型（与具体工具无关，只判断一次）
         task_lower = task_description.lower()
+        task_keywords = task_lower.split()
+        # 本次任务各工具类别的加分（中文触发词不受大小写影响，统一在小写文本中查找）
+        category_boosts: Dict[str, int] = {}
+        for triggers, categories, boost in _CATEGORY_TRIGGERS:
+            if any(trigger in task_lower for trigger in triggers):
+                for category in categories:
+                    category_boosts[category] = category_boosts.get(category, 0) + boost
+        
+        # 基于描述的关键词匹配得分（每个出现的关键词计1分）
+        keyword_scores: Counter[str] = Counter()
+        for keyword in task_keywords:
+            keyword_scores.update(self._keyword_tools(keyword))
         
         for tool_name in available_tools:
-            if tool_name not in self.tools_db:
+            match_info = self._tool_match_index.get(tool_name)
+            if match_info is None:
                 continue
             
             tool_info = self.tools_db[tool_name]
-            score = 0
-            
+            name_lower, category, _ = match_info
             # 基于类别的匹配
-            category = tool_info.get("category", "")
-            if "文档" in task_description or "doc" in task_lower or "write" in task_lower:
-                if category in ["document", "wiki"]:
-                    score += 3
-            
-            if "搜索" in task_description or "search" in task_lower:
-                if category == "search":
-                    score += 3
-            
-            if "文件" in task_description or "file" in task_lower or "storage" in task_lower:
-                if category == "storage":
-                    score += 3
+            score = category_boosts.get(category, 0)
             
             # 基于工具名称的匹配
-            if tool_name.lower() in task_lower:
+            if name_lower in task_lower:
                 score += 2
             
-            # 基于描述的关键词匹配
-            description = tool_info.get("description", "")
-            for keyword in task_lower.split():
-                if keyword in description.lower():
-                    score += 1
+            # 基于描述的关键词匹配（子串匹配，中文描述中没有空格分词）
+            score += keyword_scores[tool_name]
             
             if score > 0:
                 recommendations.append({
@@ -254,7 +402,8 @@ class PermissionAnalyzer:
                     "category": category,
                     "complexity": tool_info.get("complexity", "unknown"),
                     "score": score,
-                    "actions": tool_info.get("actions", []),
+                    # 工具数据库在实例间共享，返回操作列表的副本
+                    "actions": list(tool_info.get("actions", ())),
                     "requires_api_key": tool_info.get("requires_api_key", False)
                 })
         
@@ -267,53 +416,41 @@ class PermissionAnalyzer:
             "total_tools_considered": len(available_tools)
         }
     
+    def _find_tools_by_keyword(self, keyword: str) -> tuple:
+        """查找描述中包含关键词的工具"""
+        return tuple(
+            tool_name for tool_name, (_, _, description_lower) in self._tool_match_index.items()
+            if keyword in description_lower
+        )
+    
     def format_analysis_report(self, analysis_result: Dict) -> str:
         """格式化分析报告"""
-        report = []
-        report.append("=" * 60)
-        report.append("LLM痛点分析器 - 权限验证报告")
-        report.append("=" * 60)
-        report.append(f"工具: {analysis_result.get('tool', 'unknown')}")
-        report.append(f"操作: {analysis_result.get('action', 'unknown')}")
-        report.append(f"权限状态: {analysis_result.get('permission_status', 'unknown')}")
-        report.append("")
-        
-        # 权限信息
-        report.append("权限需求:")
-        for perm in analysis_result.get("permissions_required", []):
-            report.append(f"  - {perm}")
-        
-        report.append("")
-        report.append("当前可用权限:")
-        for perm in analysis_result.get("permissions_available", []):
-            report.append(f"  - {perm}")
-        
-        # 错误信息
-        if analysis_result.get("error_message"):
-            report.append("")
-            report.append("错误信息:")
-            report.append(f"  {analysis_result['error_message']}")
-        
-        # 建议
-        if analysis_result.get("suggestions"):
-            report.append("")
-            report.append("建议:")
-            for suggestion in analysis_result.get("suggestions", []):
-                report.append(f"  - {suggestion}")
-        
-        report.append("=" * 60)
-        return "\n".join(report)
+        return "\n".join(_render_analysis_report(analysis_result))
 
 
-def main():
-    """命令行入口点"""
+@functools.lru_cache(maxsize=8)
+def get_permission_analyzer(config_dir: Optional[str] = None) -> PermissionAnalyzer:
+    """获取共享的权限分析器实例（按配置目录缓存，避免重复加载配置）"""
+    return PermissionAnalyzer(config_dir)
+
+
+@functools.lru_cache(maxsize=1)
+def _get_parser():
+    """命令行参数解析器（argparse 只在命令行模式下导入，作为库使用时不加载）"""
+    import argparse
+    
     parser = argparse.ArgumentParser(description="LLM痛点分析器 - 权限验证模块")
     parser.add_argument("--tool", help="工具名称")
     parser.add_argument("--action", help="操作名称")
     parser.add_argument("--task", help="任务描述（用于工具推荐）")
     parser.add_argument("--config-dir", help="配置文件目录")
     parser.add_argument("--format", choices=["json", "text"], default="text", help="输出格式")
-    
+    return parser
+
+
+def main():
+    """命令行入口点"""
+    parser = _get_parser()
     args = parser.parse_args()
     
     analyzer = PermissionAnalyzer(args.config_dir)
@@ -322,7 +459,7 @@ def main():
         # 工具推荐模式
         recommendation = analyzer.get_tool_recommendation(args.task)
         if args.format == "json":
-            print(json.dumps(recommendation, indent=2, ensure_ascii=False))
+            print(_json_dumps(recommendation))
         else:
             print(f"任务: {recommendation['task']}")
             print(f"考虑的工具数量: {recommendation['total_tools_considered']}")
@@ -341,7 +478,7 @@ def main():
         # 权限分析模式
         analysis = analyzer.analyze_permission_requirements(args.tool, args.action)
         if args.format == "json":
-            print(json.dumps(analysis, indent=2, ensure_ascii=False))
+            print(_json_dumps(analysis))
         else:
             print(analyzer.format_analysis_report(analysis))
     
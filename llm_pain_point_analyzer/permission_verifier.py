@@ -4,37 +4,183 @@ LLM痛点分析器 - 权限验证模块
 解决权限认知偏差问题
 """
 
-import json
 import sys
-import re
-import argparse
 import os
+import functools
+import hashlib
+from types import MappingProxyType, SimpleNamespace
 from pathlib import Path
-from typing import Dict, List, Optional, Any, Tuple, Set
-from datetime import datetime
-import subprocess
+from typing import AbstractSet, Any, Dict, Iterable, List, Mapping, Optional, Set, Tuple
 from collections import defaultdict
 
-class PermissionVerifier:
+from llm_pain_point_analyzer._common import _LazyAttributes, _json_dumps, _json_dumps_compact, _json_loads
+
+
+def _copy_verification(verification: Dict) -> Dict:
+    """复制缓存的验证结果（复制到列表元素一级），防止调用方修改缓存"""
+    return {
+        key: [dict(item) if isinstance(item, dict) else item for item in value] if isinstance(value, list) else value
+        for key, value in verification.items()
+    }
+
+
+# 跨进程共享验证结果的Redis二级缓存（设置环境变量 LLM_PPA_REDIS_URL 后启用）
+_REDIS_URL_ENV = "LLM_PPA_REDIS_URL"
+_REDIS_TTL_SECONDS = 300
+# 验证结果结构或内置默认配置变化时递增，使旧的缓存条目失效
+_REDIS_KEY_VERSION = 1
+_CONFIG_FILES = ("permission_mappings.json", "tool_requirements.json", "scope_descriptions.json", "permission_hierarchy.json")
+
+
+@functools.lru_cache(maxsize=1)
+def _get_redis_cache():
+    """
+    获取Redis客户端（可选依赖，只在设置了环境变量时导入）
+    
+    Returns:
+        (客户端, Redis异常基类)；未启用或未安装redis时返回None
+    """
+    url = os.environ.get(_REDIS_URL_ENV)
+    if not url:
+        return None
+    try:
+        import redis
+    except ImportError:
+        return None
+    return redis.Redis.from_url(url), redis.RedisError
+
+
+# 存在层级匹配时的推荐
+_HIERARCHY_RECOMMENDATION = "当前权限通过层级关系满足部分需求，但建议申请具体权限以获得最佳兼容性"
+
+_SEPARATOR = "=" * 70
+_SUBSEPARATOR = "-" * 70
+_REPORT_HEADER = "\n".join((_SEPARATOR, "LLM痛点分析器 - 智能权限验证报告", _SEPARATOR))
+
+# 没有描述的权限范围的说明；get_scope_description 对未知范围共用这个只读对象，不再每次构建字典
+_UNKNOWN_SCOPE_LABEL = "未知权限范围"
+_UNKNOWN_SCOPE_DESCRIPTION: Mapping = MappingProxyType({
+    "description": _UNKNOWN_SCOPE_LABEL,
+    "capabilities": (),
+    "limitations": ("权限信息不可用",),
+    "typical_use": ()
+})
+
+
+class PermissionVerifier(_LazyAttributes):
     """智能权限验证器"""
     
-    def __init__(self, config_dir: str = None):
+    # 可能按配置目录创建多个验证器，用槽代替实例 __dict__ 以减小内存占用、加快属性访问
+    __slots__ = (
+        "config_dir",
+        "permission_mappings",
+        "tool_requirements",
+        "scope_descriptions",
+        "permission_hierarchy",
+        "_hierarchy_index",
+        "_tool_action_index",
+        "_apply_scope_label",
+        "_scope_label",
+        "_config_fingerprint",
+        "_required_scopes_cached",
+        "_verify_cached",
+    )
+    
+    # 惰性属性 -> 计算方法。配置文件在首次访问时才加载（如只查询权限描述时只读取一个文件），
+    # 预处理索引依赖对应的配置，首次使用时才构建
+    _LAZY_ATTRIBUTES = {
+        "permission_mappings": "load_permission_mappings",
+        "tool_requirements": "load_tool_requirements",
+        "scope_descriptions": "load_scope_descriptions",
+        "permission_hierarchy": "load_permission_hierarchy",
+        "_hierarchy_index": "_build_hierarchy_index",
+        "_tool_action_index": "_build_tool_action_index",
+        "_apply_scope_label": "_build_apply_scope_label",
+        "_scope_label": "_build_scope_label",
+        "_config_fingerprint": "_build_config_fingerprint",
+    }
+    
+    def __init__(self, config_dir: Optional[str] = None):
         """初始化权限验证器"""
         if config_dir is None:
             config_dir = os.path.join(os.path.dirname(__file__), "../config")
         
         self.config_dir = Path(config_dir)
-        self.permission_mappings = self.load_permission_mappings()
-        self.tool_requirements = self.load_tool_requirements()
-        self.scope_descriptions = self.load_scope_descriptions()
-        self.permission_hierarchy = self.load_permission_hierarchy()
+        # 按 (工具, 操作) 缓存所需权限；缓存元组，对外返回新列表
+        self._required_scopes_cached = functools.lru_cache(maxsize=512)(self._compute_required_scopes)
+        # 按 (可用权限, 所需权限) 缓存验证结果；结果与列表顺序有关，因此以元组而非集合为键
+        self._verify_cached = functools.lru_cache(maxsize=1024)(self._verify_scope_tuples)
+    
+    def _build_hierarchy_index(self) -> Tuple[Dict[str, frozenset], Dict[str, frozenset], Dict[str, frozenset]]:
+        """
+        将权限层级展平为索引
         
+        Returns:
+            (高级权限 -> 包含的权限, 权限 -> 展开时补充的高级权限, 权限 -> 所有包含它的高级权限)；
+            与逐层扫描保持一致：展开时同一类别中本身是高级权限的范围不补充其父权限
+        """
+        children_of = defaultdict(set)
+        parents_of = defaultdict(set)
+        included_by = defaultdict(set)
+        for hierarchy in self.permission_hierarchy.values():
+            for parent_scope, parent_info in hierarchy.items():
+                if "includes" not in parent_info:
+                    continue
+                children_of[parent_scope].update(parent_info["includes"])
+                for child_scope in parent_info["includes"]:
+                    included_by[child_scope].add(parent_scope)
+                    if child_scope not in hierarchy:
+                        parents_of[child_scope].add(parent_scope)
+        
+        return (
+            {scope: frozenset(children) for scope, children in children_of.items()},
+            {scope: frozenset(parents) for scope, parents in parents_of.items()},
+            {scope: frozenset(parents) for scope, parents in included_by.items()},
+        )
+    
+    def _build_tool_action_index(self) -> Dict[Tuple[str, str], Tuple[str, ...]]:
+        """将权限映射展平为 (工具, 操作) -> 权限范围；同一操作出现在多个类别时按类别顺序合并"""
+        index: Dict[Tuple[str, str], Tuple[str, ...]] = {}
+        for tools in self.permission_mappings.values():
+            for tool_name, actions in tools.items():
+                for action, scopes in actions.items():
+                    index[(tool_name, action)] = index.get((tool_name, action), ()) + tuple(scopes)
+        return index
+    
+    def _load_config(self, filename: str) -> Optional[Dict]:
+        """读取配置目录中的JSON文件，文件不存在时返回None"""
+        try:
+            data = (self.config_dir / filename).read_bytes()
+        except FileNotFoundError:
+            return None
+        return _json_loads(data)
+    
+    def _build_config_fingerprint(self) -> str:
+        """配置目录及各配置文件修改时间的摘要，作为二级缓存键的一部分，配置变化后不会读到旧结果"""
+        parts = [str(_REDIS_KEY_VERSION), str(self.config_dir.resolve())]
+        for filename in _CONFIG_FILES:
+            try:
+                parts.append(f"{filename}:{(self.config_dir / filename).stat().st_mtime_ns}")
+            except OSError:
+                parts.append(f"{filename}:-")
+        return hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()
+    
+    def _build_apply_scope_label(self) -> Dict[str, str]:
+        """预先生成每个已知权限的申请建议文本"""
+        return {
+            scope: f"申请权限: {scope} - {desc.get('description', '未知权限')}"
+            for scope, desc in self.scope_descriptions.items()
+        }
+    
+    def _build_scope_label(self) -> Dict[str, str]:
+        """报告中每个权限范围后显示的说明"""
+        return {scope: desc.get('description', '未知') for scope, desc in self.scope_descriptions.items()}
+    
     def load_permission_mappings(self) -> Dict:
         """加载权限映射"""
-        mappings_file = self.config_dir / "permission_mappings.json"
-        if mappings_file.exists():
-            with open(mappings_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
+        mappings = self._load_config("permission_mappings.json")
+        if mappings is not None:
+            return mappings
         
         # 默认权限映射
         return {
@@ -94,10 +240,9 @@ class PermissionVerifier:
     
     def load_tool_requirements(self) -> Dict:
         """加载工具需求"""
-        requirements_file = self.config_dir / "tool_requirements.json"
-        if requirements_file.exists():
-            with open(requirements_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
+        requirements = self._load_config("tool_requirements.json")
+        if requirements is not None:
+            return requirements
         
         # 默认工具需求
         return {
@@ -189,10 +334,9 @@ class PermissionVerifier:
     
     def load_scope_descriptions(self) -> Dict:
         """加载权限范围描述"""
-        scopes_file = self.config_dir / "scope_descriptions.json"
-        if scopes_file.exists():
-            with open(scopes_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
+        scopes = self._load_config("scope_descriptions.json")
+        if scopes is not None:
+            return scopes
         
         # 默认权限范围描述
         return {
@@ -272,10 +416,9 @@ class PermissionVerifier:
     
     def load_permission_hierarchy(self) -> Dict:
         """加载权限层级"""
-        hierarchy_file = self.config_dir / "permission_hierarchy.json"
-        if hierarchy_file.exists():
-            with open(hierarchy_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
+        hierarchy = self._load_config("permission_hierarchy.json")
+        if hierarchy is not None:
+            return hierarchy
         
         # 默认权限层级
         return {
@@ -315,7 +458,7 @@ class PermissionVerifier:
             }
         }
     
-    def get_required_scopes(self, tool_name: str, action: str = None) -> List[str]:
+    def get_required_scopes(self, tool_name: str, action: Optional[str] = None) -> List[str]:
         """
         获取工具操作所需的权限范围
         
@@ -326,45 +469,41 @@ class PermissionVerifier:
         Returns:
             所需的权限范围列表
         """
-        required_scopes = []
+        return list(self._required_scopes_cached(tool_name, action))
+    
+    def _compute_required_scopes(self, tool_name: str, action: Optional[str]) -> Tuple[str, ...]:
+        """计算工具操作所需的权限范围（未缓存）"""
+        required_scopes = set()
         
         # 1. 从工具需求获取基本范围
         if tool_name in self.tool_requirements:
             tool_req = self.tool_requirements[tool_name]
-            required_scopes.extend(tool_req.get("required_scopes", []))
+            required_scopes.update(tool_req.get("required_scopes", ()))
             
             if action:
                 # 2. 从权限映射获取特定操作范围
-                for category, tools in self.permission_mappings.items():
-                    if tool_name in tools and action in tools[tool_name]:
-                        required_scopes.extend(tools[tool_name][action])
-        
-        # 去重
-        required_scopes = list(set(required_scopes))
+                required_scopes.update(self._tool_action_index.get((tool_name, action), ()))
         
         # 3. 扩展层级权限
-        expanded_scopes = self.expand_hierarchical_scopes(required_scopes)
-        
-        return expanded_scopes
+        return tuple(self._expand_scope_set(required_scopes))
     
     def expand_hierarchical_scopes(self, scopes: List[str]) -> List[str]:
         """扩展层级权限"""
+        return list(self._expand_scope_set(set(scopes)))
+    
+    def _expand_scope_set(self, scopes: Set[str]) -> Set[str]:
+        """扩展层级权限（集合进、集合出，不修改传入的集合）"""
         expanded = set(scopes)
+        children_of, parents_of, _ = self._hierarchy_index
         
         for scope in scopes:
-            # 检查是否是高级权限
-            for category, hierarchy in self.permission_hierarchy.items():
-                if scope in hierarchy:
-                    # 这个scope本身是一个高级权限，需要展开
-                    if "includes" in hierarchy[scope]:
-                        expanded.update(hierarchy[scope]["includes"])
-                else:
-                    # 检查scope是否被某个高级权限包含
-                    for parent_scope, parent_info in hierarchy.items():
-                        if "includes" in parent_info and scope in parent_info["includes"]:
-                            expanded.add(parent_scope)
-        
-        return list(expanded)
+            # 高级权限展开为其包含的权限，被包含的权限补上对应的高级权限
+            if scope in children_of:
+                expanded.update(children_of[scope])
+            if scope in parents_of:
+                expanded.update(parents_of[scope])
+        
+        return expanded
     
     def verify_permission(self, available_scopes: List[str], required_scopes: List[str]) -> Dict:
         """
@@ -377,7 +516,64 @@ class PermissionVerifier:
         Returns:
             验证结果
         """
-        verification = {
+        return _copy_verification(self._verify_cached(tuple(available_scopes), tuple(required_scopes)))
+    
+    def _verify_scope_tuples(self, available_scopes: Tuple[str, ...], required_scopes: Tuple[str, ...]) -> Dict:
+        """验证权限（供结果缓存调用；启用Redis时先查二级缓存）"""
+        redis_cache = _get_redis_cache()
+        if redis_cache is None:
+            return self._verify(list(available_scopes), list(required_scopes), frozenset(available_scopes), frozenset(required_scopes))
+        
+        client, redis_error = redis_cache
+        key_source = _json_dumps_compact([self._config_fingerprint, available_scopes, required_scopes])
+        key = "llm_ppa:verify:" + hashlib.sha256(key_source).hexdigest()
+        try:
+            cached = client.get(key)
+        except redis_error:
+            cached = None
+        if cached is not None:
+            return _json_loads(cached)
+        
+        verification = self._verify(list(available_scopes), list(required_scopes), frozenset(available_scopes), frozenset(required_scopes))
+        try:
+            client.setex(key, _REDIS_TTL_SECONDS, _json_dumps_compact(verification))
+        except redis_error:
+            # 二级缓存不可用时只影响性能，不影响验证结果
+            pass
+        return verification
+    
+    def verify_permission_sets(self, available: frozenset, required: frozenset) -> Dict:
+        """
+        以集合形式验证权限（批量场景的快速路径）
+        
+        调用方已持有集合时直接传入，避免再次构建；
+        结果中的权限列表按集合的迭代顺序给出
+        """
+        return self._verify(list(available), list(required), available, required)
+    
+    def verify_permissions_batch(self, available_scopes: List[str], queries: Iterable[Tuple[str, Optional[str]]]) -> List[Dict]:
+        """
+        用同一组可用权限批量验证多个工具操作（如分析一次完整的Agent运行）
+        
+        可用权限集合只构建一次，所需权限经由 get_required_scopes 的缓存获取
+        
+        Args:
+            available_scopes: 可用权限范围
+            queries: (工具名称, 操作名称) 序列，操作名称可为None
+            
+        Returns:
+            与输入顺序一致的验证结果列表，与逐个调用 verify_permission 的结果相同
+        """
+        available_set = frozenset(available_scopes)
+        results = []
+        for tool_name, action in queries:
+            required_scopes = self.get_required_scopes(tool_name, action)
+            results.append(self._verify(list(available_scopes), required_scopes, available_set, frozenset(required_scopes)))
+        return results
+    
+    def _verify(self, available_scopes: List[str], required_scopes: List[str], available_set: frozenset, required_set: frozenset) -> Dict:
+        """验证权限（available_set/required_set 为两个列表对应的集合）"""
+        verification: Dict[str, Any] = {
             "available_scopes": available_scopes,
             "required_scopes": required_scopes,
             "missing_scopes": [],
@@ -388,54 +584,65 @@ class PermissionVerifier:
             "recommendations": []
         }
         
-        available_set = set(available_scopes)
-        required_set = set(required_scopes)
-        
         # 检查直接匹配
         direct_matches = available_set.intersection(required_set)
         verification["satisfied_scopes"] = list(direct_matches)
         
         # 检查层级匹配
-        hierarchical_matches = self.check_hierarchical_matches(available_scopes, required_scopes)
+        hierarchical_matches = self._hierarchical_matches(available_scopes, required_scopes, available_set)
         verification["hierarchical_matches"] = hierarchical_matches
         
         # 计算缺失范围
-        missing = required_set - available_set
-        
-        # 移除通过层级匹配满足的范围
-        for match in hierarchical_matches:
-            if match["required_scope"] in missing:
-                missing.remove(match["required_scope"])
+        if required_set <= available_set:
+            # 所需权限全部直接满足（常见情况），不会有缺失
+            missing: AbstractSet[str] = frozenset()
+        else:
+            # 移除直接满足和通过层级匹配满足的范围
+            missing = required_set.difference(available_set, {match["required_scope"] for match in hierarchical_matches})
         
         verification["missing_scopes"] = list(missing)
         
         # 计算覆盖率
         total_required = len(required_set)
-        satisfied = len(direct_matches) + len(hierarchical_matches)
-        
         if total_required > 0:
-            verification["coverage_percentage"] = (satisfied / total_required) * 100
+            verification["coverage_percentage"] = (len(direct_matches) + len(hierarchical_matches)) / total_required * 100
+        coverage_percentage = verification["coverage_percentage"]
         
         # 判断是否通过验证
-        verification["verification_passed"] = len(verification["missing_scopes"]) == 0
+        verification["verification_passed"] = not missing
         
         # 生成推荐
-        verification["recommendations"] = self.generate_recommendations(
-            verification["missing_scopes"],
-            verification["hierarchical_matches"],
-            verification["coverage_percentage"]
-        )
+        if missing:
+            verification["recommendations"] = self.generate_recommendations(
+                verification["missing_scopes"],
+                hierarchical_matches,
+                coverage_percentage
+            )
+        else:
+            # 验证通过（常见情况）时没有缺失权限相关的推荐，只剩层级说明和覆盖率提示
+            recommendations = [_HIERARCHY_RECOMMENDATION] if hierarchical_matches else []
+            if coverage_percentage < 100:
+                recommendations.append(f"权限覆盖率为 {coverage_percentage:.1f}%，建议补充缺失权限")
+            verification["recommendations"] = recommendations
         
         return verification
     
     def check_hierarchical_matches(self, available_scopes: List[str], required_scopes: List[str]) -> List[Dict]:
         """检查层级权限匹配"""
+        return self._hierarchical_matches(available_scopes, required_scopes, frozenset(available_scopes))
+    
+    def _hierarchical_matches(self, available_scopes: List[str], required_scopes: List[str], available_set: frozenset) -> List[Dict]:
+        """检查层级权限匹配（available_set 为 available_scopes 对应的集合）"""
         matches = []
+        included_by = self._hierarchy_index[2]
         
         for required_scope in required_scopes:
+            # 可用权限中与其相同或包含它的高级权限（等价于逐对调用 does_scope_include）
+            parents = included_by.get(required_scope, frozenset())
+            if required_scope not in available_set and parents.isdisjoint(available_set):
+                continue
             for available_scope in available_scopes:
-                # 检查available_scope是否包含required_scope
-                if self.does_scope_include(available_scope, required_scope):
+                if available_scope == required_scope or available_scope in parents:
                     matches.append({
                         "available_scope": available_scope,
                         "required_scope": required_scope,
@@ -452,27 +659,17 @@ class PermissionVerifier:
             return True
         
         # 检查权限层级
-        for category, hierarchy in self.permission_hierarchy.items():
-            if parent_scope in hierarchy:
-                if "includes" in hierarchy[parent_scope]:
-                    if child_scope in hierarchy[parent_scope]["includes"]:
-                        return True
-        
-        return False
+        return child_scope in self._hierarchy_index[0].get(parent_scope, ())
     
     def generate_recommendations(self, missing_scopes: List[str], hierarchical_matches: List[Dict], coverage_percentage: float) -> List[str]:
         """生成推荐"""
-        recommendations = []
-        
-        # 缺失权限推荐
-        for scope in missing_scopes:
-            if scope in self.scope_descriptions:
-                desc = self.scope_descriptions[scope]
-                recommendations.append(f"申请权限: {scope} - {desc.get('description', '未知权限')}")
+        # 缺失权限推荐（没有描述的权限不生成申请建议）
+        apply_scope_label = self._apply_scope_label
+        recommendations = [apply_scope_label[scope] for scope in missing_scopes if scope in apply_scope_label]
         
         # 层级匹配推荐
         if hierarchical_matches:
-            recommendations.append("当前权限通过层级关系满足部分需求，但建议申请具体权限以获得最佳兼容性")
+            recommendations.append(_HIERARCHY_RECOMMENDATION)
         
         # 覆盖率推荐
         if coverage_percentage < 100:
@@ -485,24 +682,14 @@ class PermissionVerifier:
         
         return recommendations
     
-    def get_scope_description(self, scope: str) -> Dict:
-        """获取权限范围描述"""
-        if scope in self.scope_descriptions:
-            return self.scope_descriptions[scope]
-        
-        return {
-            "description": "未知权限范围",
-            "capabilities": [],
-            "limitations": ["权限信息不可用"],
-            "typical_use": []
-        }
+    def get_scope_description(self, scope: str) -> Mapping:
+        """获取权限范围描述（未知范围返回共享的只读说明）"""
+        return self.scope_descriptions.get(scope, _UNKNOWN_SCOPE_DESCRIPTION)
     
-    def format_verification_report(self, verification: Dict, tool_name: str = None, action: str = None) -> str:
+    def format_verification_report(self, verification: Dict, tool_name: Optional[str] = None, action: Optional[str] = None) -> str:
         """格式化验证报告"""
-        report = []
-        report.append("=" * 70)
-        report.append("LLM痛点分析器 - 智能权限验证报告")
-        report.append("=" * 70)
+        scope_label = self._scope_label
+        report = [_REPORT_HEADER]
         
         if tool_name:
             report.append(f"工具: {tool_name}")
@@ -512,81 +699,150 @@ class PermissionVerifier:
         
         report.append(f"验证结果: {'通过' if verification['verification_passed'] else '失败'}")
         report.append(f"权限覆盖率: {verification['coverage_percentage']:.1f}%")
-        report.append("-" * 70)
+        report.append(_SUBSEPARATOR)
         
         # 所需权限
         if verification.get('required_scopes'):
             report.append("所需权限范围:")
-            for scope in verification['required_scopes']:
-                desc = self.get_scope_description(scope)
-                report.append(f"  • {scope} - {desc.get('description', '未知')}")
+            report.extend([f"  • {scope} - {scope_label.get(scope, _UNKNOWN_SCOPE_LABEL)}" for scope in verification['required_scopes']])
         
         # 可用权限
         if verification.get('available_scopes'):
             report.append("\n可用权限范围:")
-            for scope in verification['available_scopes']:
-                desc = self.get_scope_description(scope)
-                report.append(f"  • {scope} - {desc.get('description', '未知')}")
+            report.extend([f"  • {scope} - {scope_label.get(scope, _UNKNOWN_SCOPE_LABEL)}" for scope in verification['available_scopes']])
         
         # 满足的权限
         if verification.get('satisfied_scopes'):
             report.append("\n直接满足的权限:")
-            for scope in verification['satisfied_scopes']:
-                report.append(f"  ✓ {scope}")
+            report.extend([f"  ✓ {scope}" for scope in verification['satisfied_scopes']])
         
         # 层级匹配
         if verification.get('hierarchical_matches'):
             report.append("\n层级关系满足的权限:")
-            for match in verification['hierarchical_matches']:
-                report.append(f"  ≈ {match['available_scope']} → {match['required_scope']}")
+            report.extend([f"  ≈ {match['available_scope']} → {match['required_scope']}" for match in verification['hierarchical_matches']])
         
         # 缺失权限
         if verification.get('missing_scopes'):
             report.append("\n缺失的权限:")
-            for scope in verification['missing_scopes']:
-                desc = self.get_scope_description(scope)
-                report.append(f"  ✗ {scope} - {desc.get('description', '未知')}")
+            report.extend([f"  ✗ {scope} - {scope_label.get(scope, _UNKNOWN_SCOPE_LABEL)}" for scope in verification['missing_scopes']])
         
         # 推荐
         if verification.get('recommendations'):
             report.append("\n推荐措施:")
-            for i, rec in enumerate(verification['recommendations'], 1):
-                report.append(f"  {i}. {rec}")
+            report.extend([f"  {i}. {rec}" for i, rec in enumerate(verification['recommendations'], 1)])
         
-        report.append("=" * 70)
+        report.append(_SEPARATOR)
         return "\n".join(report)
 
 
-def main():
-    """命令行入口点"""
+# 快速路径识别的命令行选项 -> 参数名
+_CLI_OPTIONS = {
+    "--tool": "tool",
+    "--action": "action",
+    "--batch-queries": "batch_queries",
+    "--available-scopes": "available_scopes",
+    "--config-dir": "config_dir",
+    "--format": "format",
+}
+
+
+@functools.lru_cache(maxsize=1)
+def _get_parser():
+    """命令行参数解析器（argparse 只在需要时导入）"""
+    import argparse
+    
     parser = argparse.ArgumentParser(description="LLM痛点分析器 - 权限验证模块")
-    parser.add_argument("--tool", required=True, help="工具名称")
+    parser.add_argument("--tool", help="工具名称")
     parser.add_argument("--action", help="操作名称")
+    parser.add_argument("--batch-queries", help='批量验证：[工具名称, 操作名称] 列表（JSON格式），如 [["feishu_doc", "create"], ["read", null]]')
     parser.add_argument("--available-scopes", help="可用权限范围（JSON格式）")
     parser.add_argument("--config-dir", help="配置文件目录")
     parser.add_argument("--format", choices=["json", "text"], default="text", help="输出格式")
+    parser.add_argument("--fast", action="store_true", help="跳过argparse直接解析参数（也可设置环境变量 LLM_PPA_FAST=1）")
+    return parser
+
+
+def _parse_args_fast(argv: List[str]) -> Optional[SimpleNamespace]:
+    """
+    不经过argparse解析常见形式的参数（Agent循环中频繁调用时节省启动时间）
     
-    args = parser.parse_args()
+    只接受 "--选项 值" 和 "--选项=值"；遇到其他写法（--help、未知选项、缺少值等）返回None，
+    由argparse处理并给出正常的错误信息
+    """
+    values = dict.fromkeys(_CLI_OPTIONS.values())
+    values["format"] = "text"
+    values["fast"] = True
+    args = iter(argv)
+    for arg in args:
+        if arg == "--fast":
+            continue
+        option, sep, value = arg.partition("=")
+        if option not in _CLI_OPTIONS:
+            return None
+        if not sep:
+            next_value = next(args, None)
+            if next_value is None or next_value.startswith("-"):
+                return None
+            value = next_value
+        values[_CLI_OPTIONS[option]] = value
     
-    verifier = PermissionVerifier(args.config_dir)
+    if values["format"] not in ("json", "text") or (values["tool"] is None and values["batch_queries"] is None):
+        return None
+    return SimpleNamespace(**values)
+
+
+def main():
+    """命令行入口点"""
+    argv = sys.argv[1:]
+    args = None
+    if os.environ.get("LLM_PPA_FAST") == "1" or "--fast" in argv:
+        args = _parse_args_fast(argv)
+    if args is None:
+        parser = _get_parser()
+        args = parser.parse_args(argv)
+        if args.tool is None and args.batch_queries is None:
+            parser.error("需要提供 --tool 或 --batch-queries")
     
-    # 获取所需权限
-    required_scopes = verifier.get_required_scopes(args.tool, args.action)
+    _run(args)
+
+
+def _run(args) -> None:
+    """按解析后的命令行参数执行验证并输出结果"""
+    verifier = PermissionVerifier(args.config_dir)
     
     # 解析可用权限
     available_scopes = []
     if args.available_scopes:
         try:
-            available_scopes = json.loads(args.available_scopes)
-        except json.JSONDecodeError:
+            available_scopes = _json_loads(args.available_scopes)
+        except ValueError:
             print("错误: 可用权限范围必须是有效的JSON格式")
             sys.exit(1)
     
+    if args.batch_queries:
+        # 批量验证
+        try:
+            queries = [(tool_name, action) for tool_name, action in _json_loads(args.batch_queries)]
+        except (ValueError, TypeError):
+            print("错误: 批量查询必须是有效的JSON格式")
+            sys.exit(1)
+        verifications = verifier.verify_permissions_batch(available_scopes, queries)
+        
+        if args.format == "json":
+            print(_json_dumps(verifications))
+        else:
+            for (tool_name, action), verification in zip(queries, verifications):
+                print(verifier.format_verification_report(verification, tool_name, action))
+        return
+    
+    # 获取所需权限
+    required_scopes = verifier.get_required_scopes(args.tool, args.action)
+    
     # 验证权限
     verification = verifier.verify_permission(available_scopes, required_scopes)
     
     if args.format == "json":
-        print(json.dumps(verification, indent=2, ensure_ascii=False))
+        print(_json_dumps(verification))
     else:
         print(verifier.format_verification_report(verification, args.tool, args.action))
 
@@ -4,19 +4,266 @@ LLM痛点分析器 - 工具推荐模块
 解决工具选择决策困难问题
 """
 
-import json
-import sys
-import argparse
 import os
+import functools
+import heapq
+import operator
 import re
 from pathlib import Path
-from typing import Dict, List, Optional, Any
-from datetime import datetime
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from llm_pain_point_analyzer._common import _freeze_config, _json_dumps, _json_loads
+
+
+# 输入需求 -> 触发关键词（按顺序检查，全部命中的需求都会列出）
+_INPUT_REQUIREMENT_KEYWORDS = (
+    ("path", ("路径", "path", "文件")),
+    ("content", ("内容", "content", "文本")),
+    ("query", ("查询", "query", "搜索")),
+    ("url", ("url", "链接", "网址")),
+    ("command", ("命令", "command")),
+    ("title", ("标题", "title")),
+)
+
+# 输出期望 -> 触发关键词（按顺序检查，取第一个命中的期望）
+_OUTPUT_EXPECTATION_KEYWORDS = (
+    ("document", ("文档", "doc")),
+    ("file", ("文件", "file")),
+    ("search_results", ("结果", "result", "搜索")),
+    ("content", ("内容", "content", "文本")),
+    ("command_output", ("命令", "command", "执行")),
+)
+
+
+@functools.lru_cache(maxsize=32)
+def _load_json_cached(path: str, mtime_ns: int) -> Mapping:
+    """
+    解析JSON配置文件（按路径和修改时间缓存，多个推荐器实例共享解析结果）
+    
+    文件被修改后修改时间变化，会重新解析；与内置默认配置一样包装为只读映射后共享。
+    不做跨进程的 pickle 磁盘缓存：实测反序列化（含工具记录）比 JSON 解析加重建索引更慢
+    """
+    return _freeze_config(_json_loads(Path(path).read_bytes()))
+
+
+def _copy_result(obj):
+    """复制缓存的结果（逐层复制字典和列表），防止调用方修改缓存"""
+    if isinstance(obj, dict):
+        return {key: _copy_result(value) for key, value in obj.items()}
+    if isinstance(obj, list):
+        return [_copy_result(item) for item in obj]
+    return obj
+
+
+def _load_config(path: Path) -> Optional[Mapping]:
+    """读取配置文件（经由解析缓存），文件不存在时返回None"""
+    try:
+        mtime_ns = path.stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+    return _load_json_cached(str(path), mtime_ns)
+
+
+# 复杂度判断关键词
+_COMPLEX_KEYWORDS = ("复杂", "困难", "挑战", "多步骤", "系统", "集成", "自动化")
+
+# 关键词提取：分词正则与停用词
+_WORD_RE = re.compile(r'\b\w+\b')
+# 纯 ASCII 文本的快速分词：\w 在 ASCII 范围内即 [A-Za-z0-9_]，其余字节替换为空格后按空白切分，结果与 _WORD_RE 一致
+_ASCII_WORD_BYTES = frozenset(b"ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789_")
+_ASCII_NON_WORD_TO_SPACE = bytes(byte if byte in _ASCII_WORD_BYTES else 0x20 for byte in range(256))
+# 单字停用词已被长度过滤排除，保留在表中便于维护；多字停用词（如"一个"）在以空格分隔的文本中会成为独立的词
+_STOP_WORDS = frozenset({"的", "了", "在", "是", "我", "有", "和", "就", "不", "人", "都", "一", "一个", "上", "也", "很", "到", "说", "要", "去", "你", "会", "着", "没有", "看", "好", "自己", "这"})
+
+# 简单的输出类型匹配：任务期望输出 -> 兼容的工具输出类型
+_OUTPUT_TYPE_MAPPING = {
+    "document": ("document_url", "wiki_url"),
+    "file": ("file_content", "file_status", "file_list"),
+    "content": ("extracted_content", "file_content"),
+    "search_results": ("search_results",),
+    "command_output": ("command_output",),
+}
+
+# 推荐报告中的固定文本
+_SEPARATOR = "=" * 70
+_SUBSEPARATOR = "-" * 70
+_REPORT_HEADER = "\n".join((_SEPARATOR, "LLM痛点分析器 - 智能工具推荐报告", _SEPARATOR))
+_NO_RECOMMENDATION = "⚠️ 没有找到合适的工具推荐"
+_FEISHU_DOC_TIP = "   💡 注意: feishu_doc.create(content='...') 会将内容写入标题\n       建议使用两步操作: 1) 创建标题 2) update_block添加内容"
+
+
+# 内置默认配置（配置文件不存在时使用），导入时构建一次，各实例共享只读数据
+_DEFAULT_TOOLS_DB: Mapping = _freeze_config({
+    "feishu_doc": {
+        "description": "飞书文档操作（创建、读取、更新、删除）",
+        "capabilities": ["document_creation", "content_writing", "document_management"],
+        "success_rate": 0.85,
+        "avg_response_time": 2.3,
+        "complexity": "medium",
+        "permissions_required": ["docx:document:write_only", "docx:document:read_only"],
+        "input_requirements": ["title", "content", "folder_token"],
+        "output_type": "document_url"
+    },
+    "feishu_drive": {
+        "description": "飞书云盘操作（文件管理、文件夹操作）",
+        "capabilities": ["file_management", "folder_operations", "storage_access"],
+        "success_rate": 0.92,
+        "avg_response_time": 1.8,
+        "complexity": "low",
+        "permissions_required": ["drive:drive:read_only", "drive:drive:write_only"],
+        "input_requirements": ["folder_token", "file_token", "action"],
+        "output_type": "file_list"
+    },
+    "feishu_wiki": {
+        "description": "飞书知识库操作（空间管理、节点操作）",
+        "capabilities": ["knowledge_management", "wiki_operations", "content_organization"],
+        "success_rate": 0.78,
+        "avg_response_time": 2.8,
+        "complexity": "medium",
+        "permissions_required": ["wiki:wiki:read_only", "wiki:wiki:write_only"],
+        "input_requirements": ["space_id", "node_token", "title"],
+        "output_type": "wiki_url"
+    },
+    "web_search": {
+        "description": "网页搜索（实时信息查询、研究）",
+        "capabilities": ["information_retrieval", "research", "real_time_data"],
+        "success_rate": 0.65,
+        "avg_response_time": 3.5,
+        "complexity": "low",
+        "permissions_required": ["search:api:access"],
+        "input_requirements": ["query", "count", "freshness"],
+        "output_type": "search_results",
+        "requires_api_key": True
+    },
+    "web_fetch": {
+        "description": "网页内容提取（HTML转Markdown/Text）",
+        "capabilities": ["content_extraction", "web_scraping", "text_processing"],
+        "success_rate": 0.88,
+        "avg_response_time": 2.1,
+        "complexity": "low",
+        "permissions_required": ["web:access:read_only"],
+        "input_requirements": ["url", "extract_mode", "max_chars"],
+        "output_type": "extracted_content"
+    },
+    "read": {
+        "description": "文件读取（文本文件、图片）",
+        "capabilities": ["file_reading", "content_access", "data_loading"],
+        "success_rate": 0.95,
+        "avg_response_time": 0.5,
+        "complexity": "low",
+        "permissions_required": ["file:read:local"],
+        "input_requirements": ["path", "offset", "limit"],
+        "output_type": "file_content"
+    },
+    "write": {
+        "description": "文件写入（创建、覆盖文件）",
+        "capabilities": ["file_writing", "content_creation", "data_storage"],
+        "success_rate": 0.93,
+        "avg_response_time": 0.7,
+        "complexity": "low",
+        "permissions_required": ["file:write:local"],
+        "input_requirements": ["path", "content"],
+        "output_type": "file_status"
+    },
+    "edit": {
+        "description": "文件编辑（精确文本替换）",
+        "capabilities": ["file_editing", "text_manipulation", "content_modification"],
+        "success_rate": 0.90,
+        "avg_response_time": 0.9,
+        "complexity": "medium",
+        "permissions_required": ["file:write:local"],
+        "input_requirements": ["path", "old_text", "new_text"],
+        "output_type": "edit_status"
+    },
+    "exec": {
+        "description": "命令执行（Shell命令、脚本运行）",
+        "capabilities": ["command_execution", "system_operations", "automation"],
+        "success_rate": 0.82,
+        "avg_response_time": 5.0,
+        "complexity": "high",
+        "permissions_required": ["system:exec:limited"],
+        "input_requirements": ["command", "workdir", "env"],
+        "output_type": "command_output",
+        "risk_level": "medium"
+    }
+})
+
+_DEFAULT_HISTORY_DB: Mapping = _freeze_config({
+    "usage_stats": {},
+    "success_rates": {},
+    "recent_tasks": [],
+    "user_preferences": {}
+})
+
+_DEFAULT_TASK_PATTERNS: Mapping = _freeze_config({
+    "document_operations": {
+        "keywords": ["文档", "doc", "write", "创建文档", "编辑文档", "读取文档"],
+        "tools": ["feishu_doc", "feishu_wiki", "write", "edit"],
+        "priority": ["feishu_doc", "write", "edit", "feishu_wiki"]
+    },
+    "file_operations": {
+        "keywords": ["文件", "file", "读取文件", "写入文件", "编辑文件", "文件夹"],
+        "tools": ["read", "write", "edit", "feishu_drive"],
+        "priority": ["read", "write", "edit", "feishu_drive"]
+    },
+    "search_operations": {
+        "keywords": ["搜索", "search", "查找", "查询", "研究", "信息"],
+        "tools": ["web_search", "web_fetch"],
+        "priority": ["web_search", "web_fetch"]
+    },
+    "system_operations": {
+        "keywords": ["命令", "执行", "运行", "shell", "终端", "脚本"],
+        "tools": ["exec"],
+        "priority": ["exec"]
+    },
+    "data_processing": {
+        "keywords": ["处理", "分析", "提取", "转换", "格式化", "整理"],
+        "tools": ["web_fetch", "read", "write"],
+        "priority": ["web_fetch", "read", "write"]
+    }
+})
+
+
+def _tokenize(text: str) -> List[str]:
+    """分词：纯 ASCII 文本走字节替换 + split 的快速路径，其余走正则"""
+    if text.isascii():
+        return text.encode("ascii").translate(_ASCII_NON_WORD_TO_SPACE).decode("ascii").split()
+    return _WORD_RE.findall(text)
+
+
+def _response_time_bonus(avg_time: float) -> float:
+    """响应时间加分"""
+    if avg_time < 2.0:
+        return 1.0
+    if avg_time < 5.0:
+        return 0.5
+    return 0.0
+
+
+class _ToolRecord:
+    """工具库中单个工具的预处理记录：推荐循环用属性访问代替逐项的字典查找"""
+    
+    __slots__ = (
+        "description", "description_lower", "success_rate", "avg_response_time", "time_bonus",
+        "complexity", "permissions_required", "input_requirements", "output_type",
+    )
+    
+    def __init__(self, tool_info: Dict):
+        self.description = tool_info.get("description", "")
+        self.description_lower = self.description.lower()
+        self.success_rate = tool_info.get("success_rate", 0.5)
+        self.avg_response_time = tool_info.get("avg_response_time", 5.0)
+        self.time_bonus = _response_time_bonus(self.avg_response_time)
+        self.complexity = tool_info.get("complexity", "unknown")
+        self.permissions_required = tool_info.get("permissions_required", [])
+        self.input_requirements = tool_info.get("input_requirements", [])
+        self.output_type = tool_info.get("output_type", "unknown")
+
 
 class ToolRecommender:
     """智能工具推荐器"""
     
-    def __init__(self, config_dir: str = None):
+    def __init__(self, config_dir: Optional[str] = None):
         """初始化工具推荐器"""
         if config_dir is None:
             config_dir = os.path.join(os.path.dirname(__file__), "../config")
@@ -25,162 +272,48 @@ class ToolRecommender:
         self.tools_db = self.load_tools_db()
         self.history_db = self.load_history_db()
         self.task_patterns = self.load_task_patterns()
-        
-    def load_tools_db(self) -> Dict:
+        # 任务类型 -> 小写关键词，避免每次分析时重复 lower()
+        self._task_type_keywords = tuple(
+            (task_type, tuple(keyword.lower() for keyword in pattern["keywords"]))
+            for task_type, pattern in self.task_patterns.items()
+        )
+        # 倒排索引：任务类型 -> 适用工具；关键词 -> 描述中包含该关键词的工具（按需计算并缓存）
+        self._task_type_tools = {task_type: frozenset(pattern["tools"]) for task_type, pattern in self.task_patterns.items()}
+        self._keyword_tools = functools.lru_cache(maxsize=4096)(self._find_tools_by_keyword)
+        # 工具记录：小写描述和只取决于工具本身的评分项（成功率、响应时间加分）按工具预先计算
+        self._tool_records = {tool_name: _ToolRecord(tool_info) for tool_name, tool_info in self.tools_db.items()}
+        # 相同任务描述、相同推荐条件的结果缓存（批量评测和MCP服务中重复的任务很常见）
+        self._analyze_cached = functools.lru_cache(maxsize=1024)(self._analyze_task)
+        self._recommend_cached = functools.lru_cache(maxsize=1024)(self._recommend_tools_for_key)
+        
+    def load_tools_db(self) -> Mapping:
         """加载工具数据库"""
-        tools_file = self.config_dir / "tools.json"
-        if tools_file.exists():
-            with open(tools_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
+        tools = _load_config(self.config_dir / "tools.json")
+        if tools is not None:
+            return tools
         
         # 默认工具数据库
-        return {
-            "feishu_doc": {
-                "description": "飞书文档操作（创建、读取、更新、删除）",
-                "capabilities": ["document_creation", "content_writing", "document_management"],
-                "success_rate": 0.85,
-                "avg_response_time": 2.3,
-                "complexity": "medium",
-                "permissions_required": ["docx:document:write_only", "docx:document:read_only"],
-                "input_requirements": ["title", "content", "folder_token"],
-                "output_type": "document_url"
-            },
-            "feishu_drive": {
-                "description": "飞书云盘操作（文件管理、文件夹操作）",
-                "capabilities": ["file_management", "folder_operations", "storage_access"],
-                "success_rate": 0.92,
-                "avg_response_time": 1.8,
-                "complexity": "low",
-                "permissions_required": ["drive:drive:read_only", "drive:drive:write_only"],
-                "input_requirements": ["folder_token", "file_token", "action"],
-                "output_type": "file_list"
-            },
-            "feishu_wiki": {
-                "description": "飞书知识库操作（空间管理、节点操作）",
-                "capabilities": ["knowledge_management", "wiki_operations", "content_organization"],
-                "success_rate": 0.78,
-                "avg_response_time": 2.8,
-                "complexity": "medium",
-                "permissions_required": ["wiki:wiki:read_only", "wiki:wiki:write_only"],
-                "input_requirements": ["space_id", "node_token", "title"],
-                "output_type": "wiki_url"
-            },
-            "web_search": {
-                "description": "网页搜索（实时信息查询、研究）",
-                "capabilities": ["information_retrieval", "research", "real_time_data"],
-                "success_rate": 0.65,
-                "avg_response_time": 3.5,
-                "complexity": "low",
-                "permissions_required": ["search:api:access"],
-                "input_requirements": ["query", "count", "freshness"],
-                "output_type": "search_results",
-                "requires_api_key": True
-            },
-            "web_fetch": {
-                "description": "网页内容提取（HTML转Markdown/Text）",
-                "capabilities": ["content_extraction", "web_scraping", "text_processing"],
-                "success_rate": 0.88,
-                "avg_response_time": 2.1,
-                "complexity": "low",
-                "permissions_required": ["web:access:read_only"],
-                "input_requirements": ["url", "extract_mode", "max_chars"],
-                "output_type": "extracted_content"
-            },
-            "read": {
-                "description": "文件读取（文本文件、图片）",
-                "capabilities": ["file_reading", "content_access", "data_loading"],
-                "success_rate": 0.95,
-                "avg_response_time": 0.5,
-                "complexity": "low",
-                "permissions_required": ["file:read:local"],
-                "input_requirements": ["path", "offset", "limit"],
-                "output_type": "file_content"
-            },
-            "write": {
-                "description": "文件写入（创建、覆盖文件）",
-                "capabilities": ["file_writing", "content_creation", "data_storage"],
-                "success_rate": 0.93,
-                "avg_response_time": 0.7,
-                "complexity": "low",
-                "permissions_required": ["file:write:local"],
-                "input_requirements": ["path", "content"],
-                "output_type": "file_status"
-            },
-            "edit": {
-                "description": "文件编辑（精确文本替换）",
-                "capabilities": ["file_editing", "text_manipulation", "content_modification"],
-                "success_rate": 0.90,
-                "avg_response_time": 0.9,
-                "complexity": "medium",
-                "permissions_required": ["file:write:local"],
-                "input_requirements": ["path", "old_text", "new_text"],
-                "output_type": "edit_status"
-            },
-            "exec": {
-                "description": "命令执行（Shell命令、脚本运行）",
-                "capabilities": ["command_execution", "system_operations", "automation"],
-                "success_rate": 0.82,
-                "avg_response_time": 5.0,
-                "complexity": "high",
-                "permissions_required": ["system:exec:limited"],
-                "input_requirements": ["command", "workdir", "env"],
-                "output_type": "command_output",
-                "risk_level": "medium"
-            }
-        }
+        return _DEFAULT_TOOLS_DB
     
-    def load_history_db(self) -> Dict:
+    def load_history_db(self) -> Mapping:
         """加载历史使用数据库"""
-        history_file = self.config_dir / "history.json"
-        if history_file.exists():
-            with open(history_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
+        history = _load_config(self.config_dir / "history.json")
+        if history is not None:
+            return history
         
         # 默认历史数据库
-        return {
-            "usage_stats": {},
-            "success_rates": {},
-            "recent_tasks": [],
-            "user_preferences": {}
-        }
+        return _DEFAULT_HISTORY_DB
     
-    def load_task_patterns(self) -> Dict:
+    def load_task_patterns(self) -> Mapping:
         """加载任务模式数据库"""
-        patterns_file = self.config_dir / "patterns.json"
-        if patterns_file.exists():
-            with open(patterns_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
+        patterns = _load_config(self.config_dir / "patterns.json")
+        if patterns is not None:
+            return patterns
         
         # 默认任务模式
-        return {
-            "document_operations": {
-                "keywords": ["文档", "doc", "write", "创建文档", "编辑文档", "读取文档"],
-                "tools": ["feishu_doc", "feishu_wiki", "write", "edit"],
-                "priority": ["feishu_doc", "write", "edit", "feishu_wiki"]
-            },
-            "file_operations": {
-                "keywords": ["文件", "file", "读取文件", "写入文件", "编辑文件", "文件夹"],
-                "tools": ["read", "write", "edit", "feishu_drive"],
-                "priority": ["read", "write", "edit", "feishu_drive"]
-            },
-            "search_operations": {
-                "keywords": ["搜索", "search", "查找", "查询", "研究", "信息"],
-                "tools": ["web_search", "web_fetch"],
-                "priority": ["web_search", "web_fetch"]
-            },
-            "system_operations": {
-                "keywords": ["命令", "执行", "运行", "shell", "终端", "脚本"],
-                "tools": ["exec"],
-                "priority": ["exec"]
-            },
-            "data_processing": {
-                "keywords": ["处理", "分析", "提取", "转换", "格式化", "整理"],
-                "tools": ["web_fetch", "read", "write"],
-                "priority": ["web_fetch", "read", "write"]
-            }
-        }
+        return _DEFAULT_TASK_PATTERNS
     
-    def analyze_task(self, task_description: str, context: Dict = None) -> Dict:
+    def analyze_task(self, task_description: str, context: Optional[Dict] = None) -> Dict:
         """
         分析任务需求
         
@@ -191,112 +324,90 @@ class ToolRecommender:
         Returns:
             任务分析结果
         """
+        return _copy_result(self._analyze_cached(task_description))
+    
+    def _analyze_task(self, task_description: str) -> Dict:
+        """分析任务需求（未缓存；上下文不影响分析结果）"""
         task_lower = task_description.lower()
         
-        # 识别任务类型
+        # 识别任务类型（任务类型各不相同，每个类型最多追加一次，无需去重）
         task_types = []
-        for task_type, pattern in self.task_patterns.items():
-            for keyword in pattern["keywords"]:
-                if keyword.lower() in task_lower:
+        for task_type, keywords in self._task_type_keywords:
+            for keyword in keywords:
+                if keyword in task_lower:
                     task_types.append(task_type)
                     break
         
-        # 识别复杂度
-        complexity = self.estimate_complexity(task_description)
-        
-        # 识别输入需求
-        input_requirements = self.identify_input_requirements(task_description)
-        
-        # 识别输出期望
-        output_expectation = self.identify_output_expectation(task_description)
-        
+        # 小写文本只生成一次，各识别步骤共用
         return {
             "task_description": task_description,
-            "task_types": list(set(task_types)),
-            "complexity": complexity,
-            "input_requirements": input_requirements,
-            "output_expectation": output_expectation,
-            "keywords": self.extract_keywords(task_description)
+            "task_types": task_types,
+            "complexity": self._estimate_complexity(task_description, task_lower),
+            "input_requirements": self._identify_input_requirements(task_lower),
+            "output_expectation": self._identify_output_expectation(task_lower),
+            "keywords": self._extract_keywords(task_lower)
         }
     
     def estimate_complexity(self, task_description: str) -> str:
         """估计任务复杂度"""
-        task_lower = task_description.lower()
-        
-        # 复杂任务关键词
-        complex_keywords = ["复杂", "困难", "挑战", "多步骤", "系统", "集成", "自动化"]
-        simple_keywords = ["简单", "快速", "直接", "基本", "单一", "查看", "读取"]
-        
-        complex_count = sum(1 for kw in complex_keywords if kw in task_lower)
-        simple_count = sum(1 for kw in simple_keywords if kw in kw in task_lower)
+        return self._estimate_complexity(task_description, task_description.lower())
+    
+    @staticmethod
+    def _estimate_complexity(task_description: str, task_lower: str) -> str:
+        """按原文（统计词数）和小写文本（匹配关键词）估计任务复杂度"""
+        complex_count = sum(1 for kw in _COMPLEX_KEYWORDS if kw in task_lower)
         
         # 基于长度和关键词的简单判断
-        if len(task_description.split()) > 30 or complex_count > 2:
+        word_count = len(task_description.split())
+        if word_count > 30 or complex_count > 2:
             return "high"
-        elif len(task_description.split()) > 15 or complex_count > 0:
+        elif word_count > 15 or complex_count > 0:
             return "medium"
         else:
             return "low"
     
     def identify_input_requirements(self, task_description: str) -> List[str]:
         """识别输入需求"""
+        # 中文关键词不受大小写转换影响，统一在小写文本中查找
+        return self._identify_input_requirements(task_description.lower())
+    
+    @staticmethod
+    def _identify_input_requirements(task_lower: str) -> List[str]:
+        """在小写文本中识别输入需求"""
         requirements = []
-        task_lower = task_description.lower()
-        
-        if "路径" in task_description or "path" in task_lower or "文件" in task_description:
-            requirements.append("path")
-        
-        if "内容" in task_description or "content" in task_lower or "文本" in task_description:
-            requirements.append("content")
-        
-        if "查询" in task_description or "query" in task_lower or "搜索" in task_description:
-            requirements.append("query")
-        
-        if "url" in task_lower or "链接" in task_description or "网址" in task_description:
-            requirements.append("url")
-        
-        if "命令" in task_description or "command" in task_lower:
-            requirements.append("command")
-        
-        if "标题" in task_description or "title" in task_lower:
-            requirements.append("title")
+        for requirement, keywords in _INPUT_REQUIREMENT_KEYWORDS:
+            for keyword in keywords:
+                if keyword in task_lower:
+                    requirements.append(requirement)
+                    break
         
         return requirements
     
     def identify_output_expectation(self, task_description: str) -> str:
         """识别输出期望"""
-        task_lower = task_description.lower()
-        
-        if "文档" in task_description or "doc" in task_lower:
-            return "document"
-        
-        if "文件" in task_description or "file" in task_lower:
-            return "file"
-        
-        if "结果" in task_description or "result" in task_lower or "搜索" in task_description:
-            return "search_results"
-        
-        if "内容" in task_description or "content" in task_lower or "文本" in task_description:
-            return "content"
-        
-        if "命令" in task_description or "command" in task_lower or "执行" in task_description:
-            return "command_output"
+        return self._identify_output_expectation(task_description.lower())
+    
+    @staticmethod
+    def _identify_output_expectation(task_lower: str) -> str:
+        """在小写文本中识别输出期望"""
+        for expectation, keywords in _OUTPUT_EXPECTATION_KEYWORDS:
+            for keyword in keywords:
+                if keyword in task_lower:
+                    return expectation
         
         return "unknown"
     
     def extract_keywords(self, task_description: str) -> List[str]:
         """提取关键词"""
-        # 简单的关键词提取（实际应用中可以使用更复杂的NLP）
-        words = re.findall(r'\b\w+\b', task_description.lower())
-        
-        # 过滤常见停用词
-        stop_words = {"的", "了", "在", "是", "我", "有", "和", "就", "不", "人", "都", "一", "一个", "上", "也", "很", "到", "说", "要", "去", "你", "会", "着", "没有", "看", "好", "自己", "这"}
-        
-        keywords = [word for word in words if word not in stop_words and len(word) > 1]
-        
-        return list(set(keywords))
+        return self._extract_keywords(task_description.lower())
+    
+    @staticmethod
+    def _extract_keywords(task_lower: str) -> List[str]:
+        """从小写文本中提取关键词"""
+        # 简单的关键词提取（实际应用中可以使用更复杂的NLP），过滤单字和常见停用词；按首次出现的顺序去重，结果不随哈希种子变化
+        return list(dict.fromkeys(word for word in _tokenize(task_lower) if len(word) > 1 and word not in _STOP_WORDS))
     
-    def recommend_tools(self, task_analysis: Dict, available_tools: List[str] = None, user_context: Dict = None) -> List[Dict]:
+    def recommend_tools(self, task_analysis: Dict, available_tools: Optional[List[str]] = None, user_context: Optional[Dict] = None, top_n: Optional[int] = None) -> List[Dict]:
         """
         推荐工具
         
@@ -304,82 +415,220 @@ class ToolRecommender:
             task_analysis: 任务分析结果
             available_tools: 可用工具列表
             user_context: 用户上下文
+            top_n: 只返回分数最高的前N个推荐（默认返回全部）
             
         Returns:
-            工具推荐列表
+            按分数从高到低排列的工具推荐列表
+        """
+        key = self._recommendation_key(task_analysis, available_tools, user_context)
+        if key is None:
+            # 推荐项引用工具库中共享的列表，不走缓存时同样返回副本
+            return _copy_result(self._recommend_tools(task_analysis, available_tools, user_context, top_n))
+        recommendations = self._recommend_cached(key)
+        if top_n is not None:
+            # 缓存的是完整排序结果，只复制需要的前N个
+            recommendations = recommendations[:max(top_n, 0)]
+        return _copy_result(recommendations)
+    
+    def recommend_tools_batch(self, task_descriptions: Iterable[str], available_tools: Optional[List[str]] = None, user_context: Optional[Dict] = None, top_n: Optional[int] = None) -> List[Dict]:
         """
+        批量分析任务并推荐工具（如评测集、MCP批量调用）
+        
+        相同的任务描述只处理一次；关键词倒排索引在各任务间共享。
+        批量结果不经过单次调用的结果缓存，大批量任务不会把常用结果挤出缓存
+        
+        Args:
+            task_descriptions: 任务描述序列
+            available_tools: 可用工具列表
+            user_context: 用户上下文
+            top_n: 每个任务只返回分数最高的前N个推荐（默认返回全部）
+            
+        Returns:
+            与输入顺序一致的 {"task_analysis": 任务分析, "recommendations": 工具推荐列表} 列表（每项都是独立的副本）
+        """
+        descriptions = list(task_descriptions)
+        results = {}
+        for task_description in dict.fromkeys(descriptions):
+            task_analysis = self._analyze_task(task_description)
+            results[task_description] = {
+                "task_analysis": task_analysis,
+                "recommendations": self._recommend_tools(task_analysis, available_tools, user_context, top_n)
+            }
+        return [_copy_result(results[task_description]) for task_description in descriptions]
+    
+    @staticmethod
+    def _recommendation_key(task_analysis: Dict, available_tools: Optional[List[str]], user_context: Optional[Dict]) -> Optional[tuple]:
+        """
+        推荐结果缓存的键：推荐用到的全部输入
+        
+        任务分析或用户偏好不是常规的列表形式（如自定义的字符串、元组）时返回None，不走缓存
+        """
+        fields = (
+            task_analysis.get("task_types", []),
+            task_analysis.get("keywords", []),
+            task_analysis.get("input_requirements", []),
+        )
+        if any(type(field) is not list for field in fields):
+            return None
+        
+        preferred_tools = None
+        if user_context and "preferred_tools" in user_context:
+            preferred_tools = user_context["preferred_tools"]
+            if not isinstance(preferred_tools, (list, tuple, set, frozenset)):
+                return None
+            preferred_tools = tuple(preferred_tools)
+        
+        key = (
+            tuple(map(tuple, fields)),
+            task_analysis.get("output_expectation", "unknown"),
+            task_analysis.get("complexity", "low"),
+            None if available_tools is None else tuple(available_tools),
+            preferred_tools,
+        )
+        try:
+            hash(key)
+        except TypeError:
+            return None
+        return key
+    
+    def _recommend_tools_for_key(self, key: tuple) -> List[Dict]:
+        """由缓存键还原推荐输入并推荐工具（供结果缓存调用）"""
+        (task_types, keywords, input_requirements), output_expectation, complexity, available_tools, preferred_tools = key
+        task_analysis = {
+            "task_types": list(task_types),
+            "keywords": list(keywords),
+            "input_requirements": list(input_requirements),
+            "output_expectation": output_expectation,
+            "complexity": complexity,
+        }
+        user_context = None if preferred_tools is None else {"preferred_tools": preferred_tools}
+        return self._recommend_tools(task_analysis, None if available_tools is None else list(available_tools), user_context)
+    
+    def _recommend_tools(self, task_analysis: Dict, available_tools: Optional[List[str]] = None, user_context: Optional[Dict] = None, top_n: Optional[int] = None) -> List[Dict]:
+        """推荐工具（未缓存）"""
+        tools_db = self.tools_db
         if available_tools is None:
-            available_tools = list(self.tools_db.keys())
+            available_tools = list(tools_db.keys())
+        
+        # 每个任务类型、关键词只查一次倒排索引，得到各工具的命中次数
+        task_types = task_analysis.get("task_types", [])
+        keywords = task_analysis.get("keywords", [])
+        task_type_tools = [self._task_type_tools.get(task_type, ()) for task_type in task_types]
+        keyword_tools = [self._keyword_tools(keyword) for keyword in keywords]
+        # 命中任一任务类型或关键词的候选工具；其余工具没有命中项，跳过逐项比对
+        # （其余工具的兼容性、成功率得分仍大于0，照常参与推荐，不能直接跳过）
+        candidates = frozenset().union(*task_type_tools, *keyword_tools)
+        
+        # 只取决于任务的部分在循环外取一次；循环中用到的属性和方法绑定为局部变量
+        task_inputs = task_analysis.get("input_requirements", [])
+        task_input_set = set(task_inputs)
+        task_output = task_analysis.get("output_expectation", "unknown")
+        task_complexity = task_analysis.get("complexity", "low")
+        tool_records = self._tool_records
+        score_tool = self._score_tool
+        match_reasons = self._match_reasons
+        input_compatibility = self._input_compatibility
+        output_compatibility = self._output_compatibility
         
         recommendations = []
         
         for tool_name in available_tools:
-            if tool_name not in self.tools_db:
+            record = tool_records.get(tool_name)
+            if record is None:
                 continue
             
-            tool_info = self.tools_db[tool_name]
-            score = self.calculate_tool_score(tool_name, tool_info, task_analysis, user_context)
+            if tool_name in candidates:
+                matched_task_types: Sequence[str] = [task_type for task_type, tools in zip(task_types, task_type_tools) if tool_name in tools]
+                matched_keywords: Sequence[str] = [keyword for keyword, tools in zip(keywords, keyword_tools) if tool_name in tools]
+            else:
+                matched_task_types = matched_keywords = ()
+            # 兼容性只检查一次，评分和结果共用
+            input_comp = input_compatibility(record.input_requirements, task_inputs, task_input_set)
+            output_comp = output_compatibility(record.output_type, task_output)
+            score = score_tool(
+                tool_name, user_context, len(matched_task_types), len(matched_keywords), (record.success_rate, record.time_bonus),
+                input_comp["compatibility_score"], output_comp["compatibility_score"]
+            )
             
             if score > 0:
                 recommendations.append({
                     "tool": tool_name,
-                    "description": tool_info.get("description", ""),
+                    "description": record.description,
                     "score": score,
-                    "match_reasons": self.get_match_reasons(tool_name, tool_info, task_analysis),
-                    "success_rate": tool_info.get("success_rate", 0.5),
-                    "avg_response_time": tool_info.get("avg_response_time", 5.0),
-                    "complexity": tool_info.get("complexity", "unknown"),
-                    "permissions_required": tool_info.get("permissions_required", []),
-                    "input_compatibility": self.check_input_compatibility(tool_info, task_analysis),
-                    "output_compatibility": self.check_output_compatibility(tool_info, task_analysis)
+                    "match_reasons": match_reasons(record.complexity, task_complexity, matched_task_types, matched_keywords),
+                    "success_rate": record.success_rate,
+                    "avg_response_time": record.avg_response_time,
+                    "complexity": record.complexity,
+                    "permissions_required": record.permissions_required,
+                    "input_compatibility": input_comp,
+                    "output_compatibility": output_comp
                 })
         
-        # 按分数排序
-        recommendations.sort(key=lambda x: x["score"], reverse=True)
+        # 按分数排序；只需要前N个时用堆选取，同分时与完整排序一样保持原有顺序
+        score_of = operator.itemgetter("score")
+        if top_n is not None:
+            return heapq.nlargest(top_n, recommendations, key=score_of)
+        recommendations.sort(key=score_of, reverse=True)
         
         return recommendations
     
-    def calculate_tool_score(self, tool_name: str, tool_info: Dict, task_analysis: Dict, user_context: Dict = None) -> float:
+    def _find_tools_by_keyword(self, keyword: str) -> frozenset:
+        """查找描述中包含关键词的工具"""
+        return frozenset(
+            tool_name for tool_name, record in self._tool_records.items()
+            if keyword in record.description_lower
+        )
+    
+    def _matched_task_types(self, tool_name: str, task_analysis: Dict) -> List[str]:
+        """任务类型中适用该工具的部分"""
+        task_type_tools = self._task_type_tools
+        return [task_type for task_type in task_analysis.get("task_types", []) if tool_name in task_type_tools.get(task_type, ())]
+    
+    def _matched_keywords(self, tool_name: str, tool_info: Dict, task_analysis: Dict) -> List[str]:
+        """任务关键词中出现在工具描述里的部分"""
+        keywords = task_analysis.get("keywords", [])
+        if tool_info is self.tools_db.get(tool_name):
+            # 工具库中的工具走关键词倒排索引
+            return [keyword for keyword in keywords if tool_name in self._keyword_tools(keyword)]
+        tool_description = tool_info.get("description", "").lower()
+        return [keyword for keyword in keywords if keyword in tool_description]
+    
+    def calculate_tool_score(self, tool_name: str, tool_info: Dict, task_analysis: Dict, user_context: Optional[Dict] = None) -> float:
         """计算工具匹配分数"""
-        score = 0.0
-        
+        return self._score_tool(
+            tool_name, user_context,
+            len(self._matched_task_types(tool_name, task_analysis)),
+            len(self._matched_keywords(tool_name, tool_info, task_analysis)),
+            self._static_score(tool_info),
+            self.check_input_compatibility(tool_info, task_analysis)["compatibility_score"],
+            self.check_output_compatibility(tool_info, task_analysis)["compatibility_score"]
+        )
+    
+    @staticmethod
+    def _static_score(tool_info: Dict) -> Tuple[float, float]:
+        """只取决于工具本身的评分项：(历史成功率, 响应时间加分)"""
+        return tool_info.get("success_rate", 0.5), _response_time_bonus(tool_info.get("avg_response_time", 5.0))
+    
+    def _score_tool(self, tool_name: str, user_context: Optional[Dict], task_type_matches: int, keyword_matches: int, static_score: Tuple[float, float], input_comp_score: float, output_comp_score: float) -> float:
+        """按已统计的命中次数、兼容性得分和预先计算的工具评分项计算工具匹配分数"""
         # 1. 任务类型匹配（40%）
-        task_types = task_analysis.get("task_types", [])
-        tool_capabilities = tool_info.get("capabilities", [])
-        
-        for task_type in task_types:
-            if task_type in self.task_patterns:
-                if tool_name in self.task_patterns[task_type]["tools"]:
-                    score += 4.0
+        score = 4.0 * task_type_matches
         
         # 2. 关键词匹配（20%）
-        keywords = task_analysis.get("keywords", [])
-        tool_description = tool_info.get("description", "").lower()
-        
-        for keyword in keywords:
-            if keyword in tool_description:
-                score += 1.0
+        score += keyword_matches
         
         # 3. 输入输出兼容性（20%）
-        input_comp = self.check_input_compatibility(tool_info, task_analysis)
-        output_comp = self.check_output_compatibility(tool_info, task_analysis)
-        
-        if input_comp["compatibility_score"] > 0.7:
+        if input_comp_score > 0.7:
             score += 1.0
         
-        if output_comp["compatibility_score"] > 0.7:
+        if output_comp_score > 0.7:
             score += 1.0
         
-        # 4. 历史成功率（10%）
-        success_rate = tool_info.get("success_rate", 0.5)
+        # 4. 历史成功率（10%） 5. 响应时间（10%）
+        # 两项分别累加而不预先相加，浮点结果与逐项计算一致
+        success_rate, time_bonus = static_score
         score += success_rate
-        
-        # 5. 响应时间（10%）
-        avg_time = tool_info.get("avg_response_time", 5.0)
-        if avg_time < 2.0:
-            score += 1.0
-        elif avg_time < 5.0:
-            score += 0.5
+        score += time_bonus
         
         # 6. 用户偏好（如果有）
         if user_context and "preferred_tools" in user_context:
@@ -390,31 +639,24 @@ class ToolRecommender:
     
     def get_match_reasons(self, tool_name: str, tool_info: Dict, task_analysis: Dict) -> List[str]:
         """获取匹配原因"""
-        reasons = []
-        
+        return self._match_reasons(
+            tool_info.get("complexity", "unknown"),
+            task_analysis.get("complexity", "low"),
+            self._matched_task_types(tool_name, task_analysis),
+            self._matched_keywords(tool_name, tool_info, task_analysis)
+        )
+    
+    @staticmethod
+    def _match_reasons(tool_complexity: str, task_complexity: str, matched_task_types: Sequence[str], matched_keywords: Sequence[str]) -> List[str]:
+        """按已匹配的任务类型、关键词和双方复杂度生成匹配原因"""
         # 任务类型匹配
-        task_types = task_analysis.get("task_types", [])
-        for task_type in task_types:
-            if task_type in self.task_patterns:
-                if tool_name in self.task_patterns[task_type]["tools"]:
-                    reasons.append(f"匹配任务类型: {task_type}")
+        reasons = [f"匹配任务类型: {task_type}" for task_type in matched_task_types]
         
         # 关键词匹配
-        keywords = task_analysis.get("keywords", [])
-        tool_description = tool_info.get("description", "").lower()
-        
-        matched_keywords = []
-        for keyword in keywords:
-            if keyword in tool_description:
-                matched_keywords.append(keyword)
-        
         if matched_keywords:
             reasons.append(f"匹配关键词: {', '.join(matched_keywords[:3])}")
         
         # 复杂度匹配
-        task_complexity = task_analysis.get("complexity", "low")
-        tool_complexity = tool_info.get("complexity", "unknown")
-        
         if task_complexity == tool_complexity:
             reasons.append(f"复杂度匹配: {task_complexity}")
         
@@ -422,14 +664,17 @@ class ToolRecommender:
     
     def check_input_compatibility(self, tool_info: Dict, task_analysis: Dict) -> Dict:
         """检查输入兼容性"""
-        tool_inputs = tool_info.get("input_requirements", [])
         task_inputs = task_analysis.get("input_requirements", [])
-        
+        return self._input_compatibility(tool_info.get("input_requirements", []), task_inputs, set(task_inputs))
+    
+    @staticmethod
+    def _input_compatibility(tool_inputs: List[str], task_inputs: List[str], task_input_set: set) -> Dict:
+        """按任务输入集合检查输入兼容性；matched/missing 保持工具输入的原有顺序"""
         matched = []
         missing = []
         
         for tool_input in tool_inputs:
-            if tool_input in task_inputs:
+            if tool_input in task_input_set:
                 matched.append(tool_input)
             else:
                 missing.append(tool_input)
@@ -446,21 +691,14 @@ class ToolRecommender:
     
     def check_output_compatibility(self, tool_info: Dict, task_analysis: Dict) -> Dict:
         """检查输出兼容性"""
-        tool_output = tool_info.get("output_type", "unknown")
-        task_output = task_analysis.get("output_expectation", "unknown")
-        
-        # 简单的输出类型匹配
-        output_mapping = {
-            "document": ["document_url", "wiki_url"],
-            "file": ["file_content", "file_status", "file_list"],
-            "content": ["extracted_content", "file_content"],
-            "search_results": ["search_results"],
-            "command_output": ["command_output"]
-        }
-        
+        return self._output_compatibility(tool_info.get("output_type", "unknown"), task_analysis.get("output_expectation", "unknown"))
+    
+    @staticmethod
+    def _output_compatibility(tool_output: str, task_output: str) -> Dict:
+        """按工具输出类型和任务期望输出检查输出兼容性"""
         compatibility_score = 0.0
-        if task_output in output_mapping:
-            if tool_output in output_mapping[task_output]:
+        if task_output in _OUTPUT_TYPE_MAPPING:
+            if tool_output in _OUTPUT_TYPE_MAPPING[task_output]:
                 compatibility_score = 1.0
         elif task_output == "unknown" or tool_output == "unknown":
             compatibility_score = 0.5
@@ -473,85 +711,113 @@ class ToolRecommender:
     
     def format_recommendation_report(self, task_analysis: Dict, recommendations: List[Dict], top_n: int = 3) -> str:
         """格式化推荐报告"""
-        report = []
-        report.append("=" * 70)
-        report.append("LLM痛点分析器 - 智能工具推荐报告")
-        report.append("=" * 70)
+        report = [_REPORT_HEADER]
         report.append(f"任务: {task_analysis.get('task_description', '未知任务')}")
         report.append(f"任务类型: {', '.join(task_analysis.get('task_types', ['未知']))}")
         report.append(f"复杂度: {task_analysis.get('complexity', '未知')}")
         report.append(f"关键词: {', '.join(task_analysis.get('keywords', ['无']))[:10]}")
-        report.append("-" * 70)
+        report.append(_SUBSEPARATOR)
         
         # 显示前N个推荐
         top_recommendations = recommendations[:top_n]
         
         if not top_recommendations:
-            report.append("⚠️ 没有找到合适的工具推荐")
-            report.append("=" * 70)
+            report.append(_NO_RECOMMENDATION)
+            report.append(_SEPARATOR)
             return "\n".join(report)
         
         report.append(f"推荐工具 (前{len(top_recommendations)}个):")
         
         for i, rec in enumerate(top_recommendations, 1):
-            report.append(f"\n{i}. {rec['tool']} (分数: {rec['score']:.2f})")
-            report.append(f"   描述: {rec['description']}")
-            report.append(f"   匹配原因: {', '.join(rec['match_reasons'][:2])}")
-            report.append(f"   成功率: {rec['success_rate']*100:.1f}%")
-            report.append(f"   平均响应时间: {rec['avg_response_time']:.1f}秒")
-            report.append(f"   复杂度: {rec['complexity']}")
+            # 每个推荐的固定字段合成一条多行字符串，减少逐行追加
+            report.append(
+                f"\n{i}. {rec['tool']} (分数: {rec['score']:.2f})\n"
+                f"   描述: {rec['description']}\n"
+                f"   匹配原因: {', '.join(rec['match_reasons'][:2])}\n"
+                f"   成功率: {rec['success_rate']*100:.1f}%\n"
+                f"   平均响应时间: {rec['avg_response_time']:.1f}秒\n"
+                f"   复杂度: {rec['complexity']}"
+            )
             
             # 输入兼容性
-            input_comp = rec.get('input_compatibility', {})
-            if input_comp.get('missing_inputs'):
-                report.append(f"   ⚠️ 需要额外输入: {', '.join(input_comp['missing_inputs'])}")
+            missing_inputs = rec.get('input_compatibility', {}).get('missing_inputs')
+            if missing_inputs:
+                report.append(f"   ⚠️ 需要额外输入: {', '.join(missing_inputs)}")
         
-        report.append("-" * 70)
+        report.append(_SUBSEPARATOR)
         report.append("使用建议:")
         
-        if top_recommendations:
-            best_tool = top_recommendations[0]
-            report.append(f"1. 首选: {best_tool['tool']} (分数最高)")
-            
-            if len(top_recommendations) > 1:
-                report.append(f"2. 备选: {top_recommendations[1]['tool']} (分数: {top_recommendations[1]['score']:.2f})")
-            
-            # 特定工具的建议
-            if best_tool['tool'] == 'feishu_doc':
-                report.append("   💡 注意: feishu_doc.create(content='...') 会将内容写入标题")
-                report.append("       建议使用两步操作: 1) 创建标题 2) update_block添加内容")
-            
-            if best_tool.get('permissions_required'):
-                report.append(f"   🔑 所需权限: {', '.join(best_tool['permissions_required'][:3])}")
+        best_tool = top_recommendations[0]
+        report.append(f"1. 首选: {best_tool['tool']} (分数最高)")
+        
+        if len(top_recommendations) > 1:
+            report.append(f"2. 备选: {top_recommendations[1]['tool']} (分数: {top_recommendations[1]['score']:.2f})")
+        
+        # 特定工具的建议
+        if best_tool['tool'] == 'feishu_doc':
+            report.append(_FEISHU_DOC_TIP)
         
-        report.append("=" * 70)
+        if best_tool.get('permissions_required'):
+            report.append(f"   🔑 所需权限: {', '.join(best_tool['permissions_required'][:3])}")
+        
+        report.append(_SEPARATOR)
         return "\n".join(report)
 
 
-def main():
-    """命令行入口点"""
+@functools.lru_cache(maxsize=8)
+def get_tool_recommender(config_dir: Optional[str] = None) -> ToolRecommender:
+    """获取共享的工具推荐器实例（按配置目录缓存，避免重复加载配置）"""
+    return ToolRecommender(config_dir)
+
+
+@functools.lru_cache(maxsize=1)
+def _get_parser():
+    """命令行参数解析器（argparse 只在命令行模式下导入，作为库使用时不加载）"""
+    import argparse
+    
     parser = argparse.ArgumentParser(description="LLM痛点分析器 - 工具推荐模块")
-    parser.add_argument("task", help="任务描述")
+    parser.add_argument("task", nargs="?", help="任务描述")
+    parser.add_argument("--tasks-file", help="批量推荐：每行一条任务描述的文件")
     parser.add_argument("--config-dir", help="配置文件目录")
     parser.add_argument("--top", type=int, default=3, help="显示前N个推荐")
     parser.add_argument("--format", choices=["json", "text"], default="text", help="输出格式")
-    
+    return parser
+
+
+def main():
+    """命令行入口点"""
+    parser = _get_parser()
     args = parser.parse_args()
+    if args.task is None and args.tasks_file is None:
+        parser.error("需要提供任务描述或 --tasks-file")
     
-    recommender = ToolRecommender(args.config_dir)
+    recommender = get_tool_recommender(args.config_dir)
+    
+    if args.tasks_file:
+        # 批量推荐
+        with open(args.tasks_file, encoding="utf-8") as f:
+            tasks = [line.strip() for line in f if line.strip()]
+        results = recommender.recommend_tools_batch(tasks, top_n=args.top)
+        
+        if args.format == "json":
+            print(_json_dumps(results))
+        else:
+            for result in results:
+                print(recommender.format_recommendation_report(result["task_analysis"], result["recommendations"], args.top))
+        return
     
     # 分析任务
     task_analysis = recommender.analyze_task(args.task)
     
     # 推荐工具
-    recommendations = recommender.recommend_tools(task_analysis)
+    recommendations = recommender.recommend_tools(task_analysis, top_n=args.top)
     
     if args.format == "json":
         result = {
             "task_analysis": task_analysis,
-            "recommendations": recommendations[:args.top]
+            "recommendations": recommendations
         }
-        print(json.dumps(result, indent=2, ensure_ascii=False))
+        print(_json_dumps(result))
     else:
         print(recommender.format_recommendation_report(task_analysis, recommendations, args.top))
 
@@ -28,6 +28,10 @@ setup(
     install_requires=[
         "mcp>=1.0.0",
     ],
+    extras_require={
+        "speedups": ["orjson>=3.6"],
+        "redis": ["redis>=4.0"],
+    },
     entry_points={
         "console_scripts": [
             "llm-ppa=llm_pain_point_analyzer.cli:main",
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Tests for the error diagnoser
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from llm_pain_point_analyzer.error_diagnoser import ErrorDiagnoser
+
+
+def _write_error_patterns(config_dir, patterns):
+    """Write a custom error_patterns.json into the config directory"""
+    (config_dir / "error_patterns.json").write_text(
+        json.dumps(patterns), encoding="utf-8"
+    )
+
+
+def test_inline_flag_pattern_matches(tmp_path):
+    """Test that a pattern with an inline global flag is matched instead of breaking the category regex"""
+    _write_error_patterns(
+        tmp_path,
+        {
+            "timeout_errors": {
+                "patterns": ["(?i)timed? ?out", "deadline"],
+                "category": "timeout",
+                "severity": "medium",
+            },
+        },
+    )
+    diagnoser = ErrorDiagnoser(str(tmp_path))
+
+    matches = diagnoser.match_error_patterns("Request TIMEOUT after 30s")
+    assert [match["category"] for match in matches] == ["timeout"]
+    assert diagnoser.match_error_patterns("everything is fine") == []
+
+
+def test_backreference_pattern_after_grouped_pattern(tmp_path):
+    """Test that a backreference keeps pointing at its own group when the category has other grouped patterns"""
+    _write_error_patterns(
+        tmp_path,
+        {
+            "duplicate_errors": {
+                "patterns": ["(bar)x", "(foo)-\\1"],
+                "category": "duplicate",
+                "severity": "low",
+            },
+        },
+    )
+    diagnoser = ErrorDiagnoser(str(tmp_path))
+
+    matches = diagnoser.match_error_patterns("duplicate key foo-foo")
+    assert [match["pattern"] for match in matches] == ["(foo)-\\1"]
+    assert diagnoser.match_error_patterns("duplicate key foo-bar") == []
+
+
+def test_cached_diagnosis_is_not_shared_with_callers():
+    """Test that mutating nested lists of a returned diagnosis does not leak into later cached results"""
+    diagnoser = ErrorDiagnoser()
+    first = diagnoser.diagnose_error(
+        "HTTP 403 Forbidden: permission denied", "feishu_doc", "create"
+    )
+    expected = json.loads(json.dumps(first))
+
+    first["matched_patterns"][0]["common_tools"].append("mutated")
+    first["tool_specific_analysis"]["error_code"] = "mutated"
+    first["immediate_solutions"].clear()
+
+    second = diagnoser.diagnose_error(
+        "HTTP 403 Forbidden: permission denied", "feishu_doc", "create"
+    )
+    assert second == expected
+
+
+def test_diagnose_errors_batch_matches_single_diagnoses():
+    """Test that batch diagnosis returns the same results as diagnosing each message on its own, in input order"""
+    messages = [
+        "HTTP 403 Forbidden: permission denied",
+        "Too Many Requests 429",
+        "HTTP 403 Forbidden: permission denied",
+        "400 Bad Request: invalid parameter title",
+        "everything is fine",
+    ]
+    diagnoser = ErrorDiagnoser()
+
+    batch = diagnoser.diagnose_errors_batch(messages, "feishu_doc", "create")
+
+    assert batch == [
+        diagnoser.diagnose_error(message, "feishu_doc", "create")
+        for message in messages
+    ]
+    assert [diagnosis["error_category"] for diagnosis in batch][:4] == [
+        "permission",
+        "rate_limit",
+        "permission",
+        "parameter",
+    ]
+    # Repeated messages are diagnosed once but every entry is an independent copy
+    assert batch[0] is not batch[2]
+    batch[0]["immediate_solutions"].clear()
+    assert batch[2]["immediate_solutions"]
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__]))
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Tests for the MCP server tools
+"""
+
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+pytest.importorskip("mcp")
+
+from llm_pain_point_analyzer import mcp_server
+
+
+def test_batch_analyze_mixed_operations():
+    """Test that a mixed batch returns a real result for every sub-request"""
+    requests = [
+        {
+            "id": "perm",
+            "operation": "analyze_permissions",
+            "params": {
+                "api_name": "feishu_doc.create",
+                "required_permissions": ["docx:document:write_only"],
+                "available_permissions": ["docx:document:read_only"],
+            },
+        },
+        {
+            "operation": "recommend_tools",
+            "params": {"task_description": "search for information about python"},
+        },
+        {
+            "operation": "diagnose_error",
+            "params": {
+                "api_call": "web_search.search(query='x')",
+                "error_message": "403 Forbidden: permission denied",
+            },
+        },
+    ]
+    results = json.loads(asyncio.run(mcp_server.batch_analyze(requests)))
+
+    assert set(results) == {"perm", "1", "2"}
+    assert all("result" in entry for entry in results.values()), results
+    assert results["perm"]["result"]["missing_permissions"] == [
+        "docx:document:write_only"
+    ]
+    assert results["1"]["result"]["recommendations"]
+    assert results["2"]["result"]["error_category"] == "permission"
+
+
+def test_batch_analyze_reports_unknown_operation():
+    """Test that an unknown operation is reported as an error entry without failing the batch"""
+    requests = [
+        {"operation": "nope", "params": {}},
+        {
+            "operation": "diagnose_error",
+            "params": {"api_call": "", "error_message": "Connection timed out"},
+        },
+    ]
+    results = json.loads(asyncio.run(mcp_server.batch_analyze(requests)))
+
+    assert "Unknown operation" in results["0"]["error"]
+    assert "result" in results["1"]
+
+
+def test_analyze_permissions_helper_reports_missing_permissions():
+    """Test that the permission helper checks the caller's permissions and serializes to JSON"""
+    result = json.loads(
+        mcp_server._to_json(
+            mcp_server._analyze_permissions(
+                "feishu_doc.create",
+                ["docx:document:write_only"],
+                ["docx:document:read_only"],
+            )
+        )
+    )
+
+    assert result["tool"] == "feishu_doc"
+    assert result["action"] == "create"
+    assert result["permission_status"] == "insufficient"
+    assert result["missing_permissions"] == ["docx:document:write_only"]
+    assert result["error_message"] is None
+
+    granted = mcp_server._analyze_permissions(
+        "feishu_doc.create", ["docx:document:write_only"], ["docx:document:write_only"]
+    )
+    assert granted["permission_status"] == "sufficient"
+    assert granted["missing_permissions"] == []
+
+
+def test_recommend_tools_helper_returns_ranked_tools():
+    """Test that the recommendation helper analyzes the task and ranks tools by score"""
+    result = json.loads(
+        mcp_server._to_json(
+            mcp_server._recommend_tools(
+                "search for information about python", "low", ["web"]
+            )
+        )
+    )
+
+    assert result["task_analysis"]["complexity"] == "low"
+    assert "web" in result["task_analysis"]["keywords"]
+    scores = [rec["score"] for rec in result["recommendations"]]
+    assert scores == sorted(scores, reverse=True)
+    assert result["recommendations"][0]["tool"] in ("web_search", "web_fetch")
+
+
+def test_diagnose_error_helper_uses_api_call():
+    """Test that the diagnosis helper extracts tool and action from the API call"""
+    result = json.loads(
+        mcp_server._to_json(
+            mcp_server._diagnose_error(
+                "feishu_doc.create(title='report')",
+                "HTTP 403 Forbidden: permission denied",
+            )
+        )
+    )
+
+    assert result["tool"] == "feishu_doc"
+    assert result["action"] == "create"
+    assert result["error_category"] == "permission"
+    assert result["immediate_solutions"]
+
+
+def test_async_handlers_return_real_payloads():
+    """Test that the async MCP handlers run the analyses off the event loop and return JSON results"""
+    permissions = json.loads(
+        asyncio.run(
+            mcp_server.analyze_permissions(
+                "feishu_drive.list",
+                ["drive:drive:read_only"],
+                ["drive:drive:read_only"],
+            )
+        )
+    )
+    assert permissions["permission_status"] == "sufficient"
+
+    recommendations = json.loads(
+        asyncio.run(mcp_server.recommend_tools("读取文件 path /tmp/x"))
+    )
+    assert recommendations["recommendations"]
+    assert "file_operations" in recommendations["task_analysis"]["task_types"]
+
+    diagnosis = json.loads(
+        asyncio.run(
+            mcp_server.diagnose_error(
+                "web_fetch.fetch(url=...)",
+                "Too Many Requests 429",
+                "every retry is rejected",
+            )
+        )
+    )
+    assert diagnosis["tool"] == "web_fetch"
+    assert diagnosis["error_category"] == "rate_limit"
+    assert diagnosis["immediate_solutions"]
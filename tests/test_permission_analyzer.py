@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Tests for the permission analyzer
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from llm_pain_point_analyzer.permission_analyzer import PermissionAnalyzer
+
+
+@pytest.mark.parametrize(
+    "available",
+    [
+        ["docx:document:read_only", "drive:drive:read_only"],
+        ("docx:document:read_only", "drive:drive:read_only"),
+        {"docx:document:read_only", "drive:drive:read_only"},
+        frozenset({"docx:document:read_only", "drive:drive:read_only"}),
+    ],
+)
+def test_check_permission_status_accepts_lists_and_sets(available):
+    """Test that available permissions may be passed as any collection of scopes"""
+    analyzer = PermissionAnalyzer()
+
+    assert (
+        analyzer.check_permission_status(["docx:document:read_only"], available)
+        == "sufficient"
+    )
+    assert (
+        analyzer.check_permission_status(["docx:document:write_only"], available)
+        == "insufficient"
+    )
+
+
+def test_check_permission_status_defaults_to_current_permissions():
+    """Test that omitting available permissions checks against the current permissions"""
+    analyzer = PermissionAnalyzer()
+    current = analyzer.simulate_current_permissions()
+
+    assert analyzer.check_permission_status(current[:1]) == "sufficient"
+    assert (
+        analyzer.check_permission_status(["docx:document:write_only"]) == "insufficient"
+    )
+
+
+def test_tool_recommendation_does_not_expose_shared_config():
+    """Test that mutating a returned recommendation does not leak into later analyzer instances"""
+    first = PermissionAnalyzer().get_tool_recommendation("search web")
+    expected = [
+        dict(rec, actions=list(rec["actions"])) for rec in first["recommendations"]
+    ]
+
+    first["recommendations"][0]["actions"].append("HACK")
+
+    assert (
+        PermissionAnalyzer().get_tool_recommendation("search web")["recommendations"]
+        == expected
+    )
+
+
+def test_report_header_with_unhashable_tool():
+    """Test that a report is still rendered when the tool or action value cannot be used as a cache key"""
+    analyzer = PermissionAnalyzer()
+
+    report = analyzer.format_analysis_report(
+        {"tool": ["feishu_doc"], "action": {"name": "create"}}
+    )
+
+    assert "工具: ['feishu_doc']" in report
+    assert "操作: {'name': 'create'}" in report
+    assert report == analyzer.format_analysis_report(
+        {"tool": ["feishu_doc"], "action": {"name": "create"}}
+    )
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__]))
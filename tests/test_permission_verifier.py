@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Tests for the permission verifier
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from llm_pain_point_analyzer import permission_verifier
+from llm_pain_point_analyzer.permission_verifier import PermissionVerifier
+
+AVAILABLE_SCOPES = ["docx:document:read_only", "drive:drive:all", "search:web"]
+QUERIES = [
+    ("feishu_doc", "create"),
+    ("feishu_drive", "list"),
+    ("web_search", None),
+    ("feishu_doc", "create"),
+]
+
+
+def _normalized(verification):
+    """Order-independent view of a verification result (set-based verification orders scopes by set iteration)"""
+    return {
+        key: sorted(map(repr, value)) if isinstance(value, list) else value
+        for key, value in verification.items()
+    }
+
+
+def test_verify_permissions_batch_matches_single_calls():
+    """Test that batch verification returns the same results as verifying each tool action on its own"""
+    verifier = PermissionVerifier()
+
+    batch = verifier.verify_permissions_batch(AVAILABLE_SCOPES, QUERIES)
+
+    expected = [
+        verifier.verify_permission(
+            AVAILABLE_SCOPES, verifier.get_required_scopes(tool_name, action)
+        )
+        for tool_name, action in QUERIES
+    ]
+    assert batch == expected
+    assert [verification["verification_passed"] for verification in batch] == [
+        False,
+        True,
+        True,
+        False,
+    ]
+
+
+def test_verify_permission_sets_matches_list_verification():
+    """Test that set-based verification reaches the same verdict, coverage and scopes as list-based verification"""
+    verifier = PermissionVerifier()
+
+    for tool_name, action in QUERIES:
+        required_scopes = verifier.get_required_scopes(tool_name, action)
+        by_sets = verifier.verify_permission_sets(
+            frozenset(AVAILABLE_SCOPES), frozenset(required_scopes)
+        )
+        assert _normalized(by_sets) == _normalized(
+            verifier.verify_permission(AVAILABLE_SCOPES, required_scopes)
+        )
+
+
+def test_unknown_scope_description_is_shared_and_read_only():
+    """Test that unknown scopes share one read-only description instead of building a new dict per call"""
+    verifier = PermissionVerifier()
+
+    description = verifier.get_scope_description("unknown:scope:x")
+
+    assert description is verifier.get_scope_description("unknown:scope:y")
+    assert description["description"] == "未知权限范围"
+    with pytest.raises(TypeError):
+        description["description"] = "changed"  # type: ignore[index]
+
+
+class _FakeRedisError(Exception):
+    """Stand-in for redis.RedisError"""
+
+
+class _FakeRedis:
+    """Dictionary-backed stand-in for the two redis client calls the verifier uses"""
+
+    def __init__(self, fail=False):
+        self.store = {}
+        self.fail = fail
+        self.gets = 0
+        self.sets = 0
+
+    def get(self, key):
+        self.gets += 1
+        if self.fail:
+            raise _FakeRedisError("connection refused")
+        return self.store.get(key)
+
+    def setex(self, key, ttl, value):
+        self.sets += 1
+        if self.fail:
+            raise _FakeRedisError("connection refused")
+        self.store[key] = value
+
+
+def test_redis_cache_miss_then_hit(monkeypatch):
+    """Test that a miss stores the verification in redis and a fresh verifier is served from it"""
+    client = _FakeRedis()
+    monkeypatch.setattr(
+        permission_verifier, "_get_redis_cache", lambda: (client, _FakeRedisError)
+    )
+    required_scopes = PermissionVerifier().get_required_scopes("feishu_doc", "create")
+
+    first = PermissionVerifier().verify_permission(AVAILABLE_SCOPES, required_scopes)
+    assert (client.gets, client.sets) == (1, 1)
+
+    # A new verifier has an empty in-process cache, so the second result must come from redis
+    second = PermissionVerifier().verify_permission(AVAILABLE_SCOPES, required_scopes)
+    assert (client.gets, client.sets) == (2, 1)
+    assert second == first
+
+    # Different scopes are a different key
+    PermissionVerifier().verify_permission(AVAILABLE_SCOPES[:1], required_scopes)
+    assert (client.gets, client.sets) == (3, 2)
+    assert len(client.store) == 2
+
+
+def test_redis_errors_fall_back_to_local_verification(monkeypatch):
+    """Test that an unavailable redis server only disables the second-level cache"""
+    client = _FakeRedis(fail=True)
+    monkeypatch.setattr(
+        permission_verifier, "_get_redis_cache", lambda: (client, _FakeRedisError)
+    )
+    required_scopes = PermissionVerifier().get_required_scopes("feishu_drive", "list")
+
+    verification = PermissionVerifier().verify_permission(
+        AVAILABLE_SCOPES, required_scopes
+    )
+
+    assert verification["verification_passed"] is True
+    assert (client.gets, client.sets) == (1, 1)
+
+
+def _argparse_not_used():
+    """Replacement for _get_parser that fails if the fast path falls back to argparse"""
+    raise AssertionError("argparse fallback used")
+
+
+def _run_cli(monkeypatch, capsys, argv, fast):
+    """Run the verifier CLI with the given arguments and return its standard output"""
+    monkeypatch.setattr(sys, "argv", ["permission_verifier", *argv])
+    with monkeypatch.context() as patch:
+        if fast:
+            patch.setenv("LLM_PPA_FAST", "1")
+            patch.setattr(permission_verifier, "_get_parser", _argparse_not_used)
+        else:
+            patch.delenv("LLM_PPA_FAST", raising=False)
+        permission_verifier.main()
+    return capsys.readouterr().out
+
+
+@pytest.mark.parametrize(
+    "argv",
+    [
+        [
+            "--tool",
+            "feishu_doc",
+            "--action",
+            "create",
+            "--available-scopes",
+            '["docx:document:read_only"]',
+            "--format",
+            "json",
+        ],
+        [
+            "--tool=feishu_drive",
+            "--action=list",
+            '--available-scopes=["drive:drive:all"]',
+        ],
+        [
+            "--batch-queries",
+            '[["feishu_doc", "create"], ["web_search", null]]',
+            "--available-scopes",
+            '["search:web"]',
+            "--format=json",
+        ],
+    ],
+)
+def test_fast_cli_matches_argparse(monkeypatch, capsys, argv):
+    """Test that the argparse-free fast path parses common arguments like argparse and prints the same output"""
+    fast_args = permission_verifier._parse_args_fast(argv)
+    parsed_args = permission_verifier._get_parser().parse_args(argv)
+
+    assert fast_args is not None
+    assert {**vars(fast_args), "fast": False} == vars(parsed_args)
+    assert _run_cli(monkeypatch, capsys, argv, fast=True) == _run_cli(
+        monkeypatch, capsys, argv, fast=False
+    )
+
+
+@pytest.mark.parametrize(
+    "argv",
+    [
+        ["--help"],
+        ["--tool", "feishu_doc", "--unknown", "x"],
+        ["--tool"],
+        ["--tool", "feishu_doc", "--format", "xml"],
+        ["--action", "create"],
+    ],
+)
+def test_fast_cli_defers_unusual_arguments_to_argparse(argv):
+    """Test that the fast path gives up on arguments it does not handle so argparse reports them"""
+    assert permission_verifier._parse_args_fast(argv) is None
+
+
+def test_fast_cli_flag(monkeypatch, capsys):
+    """Test that --fast selects the fast path without the environment variable"""
+    argv = [
+        "--tool",
+        "web_search",
+        "--available-scopes",
+        '["search:web"]',
+        "--format",
+        "json",
+    ]
+    expected = _run_cli(monkeypatch, capsys, argv, fast=False)
+
+    monkeypatch.setattr(permission_verifier, "_get_parser", _argparse_not_used)
+    assert _run_cli(monkeypatch, capsys, [*argv, "--fast"], fast=False) == expected
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__]))
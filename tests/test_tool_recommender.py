@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Tests for the tool recommender
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from llm_pain_point_analyzer.tool_recommender import ToolRecommender
+
+TASKS = (
+    "search for information about python",
+    "读取文件 path /tmp/x",
+    "创建飞书文档并写入内容",
+    "search for information about python",
+)
+
+
+def test_recommend_tools_batch_matches_single_calls():
+    """Test that batch recommendation returns the same analysis and ranking as one call per task, in input order"""
+    recommender = ToolRecommender()
+
+    batch = recommender.recommend_tools_batch(TASKS)
+
+    assert len(batch) == len(TASKS)
+    for task_description, entry in zip(TASKS, batch):
+        task_analysis = recommender.analyze_task(task_description)
+        assert entry["task_analysis"] == task_analysis
+        assert entry["recommendations"] == recommender.recommend_tools(task_analysis)
+    # Repeated tasks are processed once but every entry is an independent copy
+    assert batch[0] is not batch[3]
+    batch[0]["recommendations"].clear()
+    assert batch[3]["recommendations"]
+
+
+def test_recommend_tools_batch_respects_available_tools():
+    """Test that batch recommendation only ranks the available tools"""
+    recommender = ToolRecommender()
+
+    batch = recommender.recommend_tools_batch(
+        TASKS, available_tools=["web_search", "read"]
+    )
+
+    for entry in batch:
+        assert {rec["tool"] for rec in entry["recommendations"]} <= {
+            "web_search",
+            "read",
+        }
+
+
+@pytest.mark.parametrize("top_n", [0, 1, 2, 100])
+def test_top_n_slices_full_ranking(top_n):
+    """Test that top_n returns the head of the full ranking for single and batch calls"""
+    recommender = ToolRecommender()
+    task_analysis = recommender.analyze_task(TASKS[0])
+    full = recommender.recommend_tools(task_analysis)
+
+    assert recommender.recommend_tools(task_analysis, top_n=top_n) == full[:top_n]
+    assert (
+        recommender.recommend_tools_batch(TASKS[:1], top_n=top_n)[0]["recommendations"]
+        == full[:top_n]
+    )
+
+
+def test_uncached_recommendations_do_not_expose_shared_config():
+    """Test that mutating an uncached recommendation does not leak into later recommenders"""
+    task_analysis = ToolRecommender().analyze_task(TASKS[0])
+    expected = ToolRecommender().recommend_tools(task_analysis)
+    # A tuple of keywords cannot be used as a cache key, so this call takes the uncached path
+    uncached = ToolRecommender().recommend_tools(
+        dict(task_analysis, keywords=tuple(task_analysis["keywords"]))
+    )
+
+    uncached[0]["permissions_required"].append("HACK")
+    uncached[0]["input_compatibility"]["tool_inputs"].append("HACK")
+
+    assert ToolRecommender().recommend_tools(task_analysis) == expected
+
+
+def test_file_config_is_shared_read_only(tmp_path):
+    """Test that a tools.json config is frozen like the built-in defaults and results stay independent copies"""
+    tools = {
+        "web_search": {
+            "description": "search the web",
+            "permissions_required": ["web:access:read_only"],
+            "input_requirements": ["query"],
+            "output_type": "search_results",
+        },
+    }
+    (tmp_path / "tools.json").write_text(json.dumps(tools), encoding="utf-8")
+    recommender = ToolRecommender(str(tmp_path))
+
+    with pytest.raises(TypeError):
+        recommender.tools_db["web_search"]["description"] = "changed"
+
+    task_analysis = recommender.analyze_task("search for python tutorials")
+    recommendations = recommender.recommend_tools(task_analysis)
+    assert recommendations[0]["permissions_required"] == ["web:access:read_only"]
+    recommendations[0]["permissions_required"].append("HACK")
+    assert ToolRecommender(str(tmp_path)).recommend_tools(task_analysis)[0][
+        "permissions_required"
+    ] == ["web:access:read_only"]
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__]))